@@ -1,19 +1,8 @@
-import requests
-import json
+import os
+import sys
 
-url = "https://raw.githubusercontent.com/electricgoat/ba-data/refs/heads/jp/Excel/LocalizeCharProfileExcelTable.json"
-response = requests.get(url)
-data = response.json()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict.cli import run_extractor
 
-mapping = {}
-for entry in data.get("DataList", []):
-    kr = entry.get("StatusMessageKr", "").strip()
-    Jp = entry.get("StatusMessageJp", "").strip()
-    # 只在兩種語言都有內容時才加入
-    if kr and Jp:
-        mapping[kr] = Jp
-
-with open("StatusMessage.json", "w", encoding="utf-8") as outfile:
-    json.dump(mapping, outfile, ensure_ascii=False, indent=4)
-
-print(f"Mapping 共包含 {len(mapping)} 筆對應")
+if __name__ == '__main__':
+    run_extractor('jpn', 'StatusMessage.json')
@@ -0,0 +1 @@
+"""Dictionary build tooling shared by the JPN-python and zh_TW-python scripts."""
@@ -0,0 +1,142 @@
+"""Concurrent fetch engine.
+
+Runs many :meth:`HttpCache.fetch` calls at once from asyncio.  Requests go
+through one ``requests.Session`` whose connection pools keep connections
+alive per host, a semaphore caps how many requests hit the same host at a
+time, and transient failures (connection errors, timeouts, 429 and 5xx) are
+retried with exponential backoff and full jitter.  gzip/deflate, and brotli
+when the ``brotli`` package is installed, are accepted and decoded by urllib3.
+
+Every URL produces a :class:`FetchStat` so a refresh can show where its
+time and bytes went.
+"""
+import asyncio
+import collections
+import random
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .fetch import CACHE_DIR, HttpCache
+
+PER_HOST = 4
+RETRIES = 3
+BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+FetchStat = collections.namedtuple(
+    'FetchStat', 'url status attempts elapsed wire_bytes size error')
+
+
+def make_session(per_host: int = PER_HOST) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=per_host)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRY_STATUS
+    return False
+
+
+class FetchEngine:
+    def __init__(self, cache: HttpCache = None, per_host: int = PER_HOST,
+                 retries: int = RETRIES, backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF):
+        self.cache = cache or HttpCache(CACHE_DIR, session=make_session(per_host))
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._host_limits = {}
+        self._thread_limits = {}
+        self._lock = threading.Lock()
+        self.stats = []
+
+    def _limit(self, url: str) -> asyncio.Semaphore:
+        host = urllib.parse.urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    async def fetch(self, url: str) -> FetchStat:
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self._limit(url):
+                    meta = await asyncio.to_thread(self.cache.fetch, url)
+            except Exception as exc:
+                if attempt > self.retries or not is_retryable(exc):
+                    return FetchStat(url, None, attempt, time.perf_counter() - start, 0, 0, exc)
+                await asyncio.sleep(self._delay(attempt - 1))
+                continue
+            return FetchStat(url, meta['status'], attempt, time.perf_counter() - start,
+                             meta.get('wire_bytes', 0), meta['size'], None)
+
+    def fetch_blocking(self, url: str) -> FetchStat:
+        """:meth:`fetch` for worker threads: same limits and retries, raises once they are used up."""
+        start = time.perf_counter()
+        attempt = 0
+        host = urllib.parse.urlsplit(url).netloc
+        while True:
+            attempt += 1
+            try:
+                with self._thread_limit(host):
+                    meta = self.cache.fetch(url)
+            except Exception as exc:
+                if attempt > self.retries or not is_retryable(exc):
+                    self._record(FetchStat(url, None, attempt, time.perf_counter() - start, 0, 0, exc))
+                    raise
+                time.sleep(self._delay(attempt - 1))
+                continue
+            stat = FetchStat(url, meta['status'], attempt, time.perf_counter() - start,
+                             meta.get('wire_bytes', 0), meta['size'], None)
+            self._record(stat)
+            return stat
+
+    def _thread_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._thread_limits:
+                self._thread_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._thread_limits[host]
+
+    def _record(self, stat: FetchStat) -> None:
+        with self._lock:
+            self.stats.append(stat)
+
+    async def fetch_all(self, urls) -> list:
+        # Semaphores belong to the running event loop.
+        self._host_limits = {}
+        return await asyncio.gather(*(self.fetch(url) for url in dict.fromkeys(urls)))
+
+    def run(self, urls) -> list:
+        """Fetch ``urls`` concurrently and return their stats; raise if any failed."""
+        stats = self.stats = asyncio.run(self.fetch_all(urls))
+        failed = [s for s in stats if s.error is not None]
+        if failed:
+            raise RuntimeError('; '.join(f'{s.url}: {s.error}' for s in failed)) from failed[0].error
+        return stats
+
+
+def format_report(stats) -> str:
+    lines = [f"{'status':>6} {'tries':>5} {'ms':>8} {'wire':>10} {'body':>10}  url"]
+    for s in sorted(stats, key=lambda s: s.elapsed, reverse=True):
+        lines.append(f'{s.status or "ERR":>6} {s.attempts:>5} {s.elapsed * 1000:>8.0f} '
+                     f'{s.wire_bytes:>10} {s.size:>10}  {s.url}')
+    lines.append(f"{'':>6} {'':>5} {max((s.elapsed for s in stats), default=0) * 1000:>8.0f} "
+                 f'{sum(s.wire_bytes for s in stats):>10} {sum(s.size for s in stats):>10}  total')
+    return '\n'.join(lines)
@@ -0,0 +1,316 @@
+"""Aho-Corasick automaton over every key of a locale bundle.
+
+    python -m aronadict.automaton build [--locale jpn zh_tw] [--dist DIR]
+    python -m aronadict.automaton check LOCALE [--samples 300]
+
+content.js compiles one ``RegExp(key, 'gi')`` per entry and
+``translateText`` runs all of them, longest key first, over every text node.
+This module compiles all keys of ``dist/<locale>/bundle.json`` into one
+automaton, written to ``dist/<locale>/automaton.json``, so a text node is
+translated in a single left-to-right scan whatever the dictionary size.
+
+Matching is leftmost-longest and non-overlapping: at each position the
+longest key starting there wins, and scanning resumes after it.  Keys and
+text are compared case-insensitively with the per-character folding a
+non-unicode ``'gi'`` RegExp uses (:func:`js_fold`).  When several keys fold
+to the same string, the first one in content.js order (:func:`js_sorted_entries`)
+is kept.  Replacement strings get the same ``$$`` / ``$&`` / ``` $` ``` /
+``$'`` expansion as ``String.prototype.replace``.
+
+This is not always the same result as the chained regexes:
+:func:`reference_translate` reproduces that chain, and the ``check`` command
+reports the texts where the two differ.  The chain can rewrite text that an
+earlier replacement produced, and a longer key later in the text can beat a
+shorter one that starts earlier.
+
+Serialised form (nodes are numbered breadth-first, children in code point
+order, so the children of node ``s`` are consecutive and node ``i``'s
+incoming edge is ``labels[i - 1]``)::
+
+    {"format": 1,
+     "child_counts": [...],   # per node
+     "labels": "...",         # one code point per non-root node
+     "fail": [...],           # per node
+     "terminals": [...],      # node ids that end a key, ascending
+     "values": [...]}         # replacement for each terminal
+"""
+import argparse
+import bisect
+import collections
+import json
+import os
+import random
+import re
+
+from .output import dump_compact, write_if_changed
+from .sources import DIST_DIR, LOCALES, dist_dir
+
+FORMAT = 1
+ARRAY_INDEX_LIMIT = 2 ** 32 - 1
+
+
+def js_fold(ch: str) -> str:
+    """Canonicalize ``ch`` the way a RegExp with the ``i`` flag (no ``u``) does."""
+    upper = ch.upper()
+    if len(upper) != 1 or (ord(ch) >= 128 and ord(upper) < 128):
+        return ch
+    return upper
+
+
+def fold(text: str) -> str:
+    return ''.join(map(js_fold, text))
+
+
+def is_array_index(key: str) -> bool:
+    return (key == '0' or (key[:1] in '123456789' and key.isdigit() and key.isascii())) \
+        and int(key) < ARRAY_INDEX_LIMIT
+
+
+def js_entries(mapping: dict) -> list:
+    """``Object.entries(mapping)`` order: integer-like keys ascending, then insertion order."""
+    items = list(mapping.items())
+    indexed = sorted((item for item in items if is_array_index(item[0])), key=lambda item: int(item[0]))
+    return indexed + [item for item in items if not is_array_index(item[0])]
+
+
+def js_sorted_entries(mapping: dict) -> list:
+    """content.js ``sortedEntries``: :func:`js_entries` stably sorted by key length, longest first."""
+    return sorted(js_entries(mapping), key=lambda item: -len(item[0]))
+
+
+_SUBSTITUTION = re.compile(r"\$([$&`'])")
+
+
+def expand_replacement(replacement: str, text: str, start: int, end: int) -> str:
+    """Apply ``String.prototype.replace`` ``$`` patterns for a match of ``text[start:end]``."""
+    if '$' not in replacement:
+        return replacement
+
+    def substitute(m):
+        kind = m.group(1)
+        if kind == '$':
+            return '$'
+        if kind == '&':
+            return text[start:end]
+        if kind == '`':
+            return text[:start]
+        return text[end:]
+    return _SUBSTITUTION.sub(substitute, replacement)
+
+
+def reference_translate(entries: list, text: str) -> str:
+    """What ``translateText`` returns: each ``(key, replacement)`` of ``entries`` applied in turn.
+
+    ``entries`` should be :func:`js_sorted_entries` order; keys are matched
+    case-insensitively like the ``'gi'`` RegExps.  Empty keys are ignored.
+    """
+    result = text
+    folded = fold(result)
+    for key, replacement in entries:
+        if not key:
+            continue
+        needle = fold(key)
+        pos = folded.find(needle)
+        if pos < 0:
+            continue
+        pieces = []
+        last = 0
+        while pos >= 0:
+            end = pos + len(needle)
+            pieces.append(result[last:pos])
+            pieces.append(expand_replacement(replacement, result, pos, end))
+            last = end
+            pos = folded.find(needle, end)
+        pieces.append(result[last:])
+        result = ''.join(pieces)
+        folded = fold(result)
+    return result
+
+
+def compile_automaton(mapping: dict) -> dict:
+    """Build the serialised automaton for every non-empty key of ``mapping``."""
+    children = [{}]
+    key_at = {}
+    for key, value in js_sorted_entries(mapping):
+        if not key:
+            continue
+        node = 0
+        for ch in fold(key):
+            nxt = children[node].get(ch)
+            if nxt is None:
+                nxt = len(children)
+                children[node][ch] = nxt
+                children.append({})
+            node = nxt
+        key_at.setdefault(node, value)
+
+    # Renumber breadth-first with children in code point order.
+    order = [0]
+    labels = []
+    for node in order:
+        for ch in sorted(children[node]):
+            order.append(children[node][ch])
+            labels.append(ch)
+    new_id = {old: new for new, old in enumerate(order)}
+    child_counts = [len(children[old]) for old in order]
+    goto = [{ch: new_id[child] for ch, child in children[old].items()} for old in order]
+    del children
+
+    fail = [0] * len(order)
+    for node in range(len(order)):
+        for ch, child in goto[node].items():
+            if node:
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+    terminals = sorted(new_id[old] for old in key_at)
+    new_values = {new_id[old]: value for old, value in key_at.items()}
+    return {
+        'format': FORMAT,
+        'child_counts': child_counts,
+        'labels': ''.join(labels),
+        'fail': fail,
+        'terminals': terminals,
+        'values': [new_values[node] for node in terminals],
+    }
+
+
+class Automaton:
+    """Leftmost-longest matcher over a serialised automaton."""
+
+    def __init__(self, data: dict):
+        if data.get('format') != FORMAT:
+            raise ValueError(f"unsupported automaton format {data.get('format')}")
+        counts = data['child_counts']
+        self.labels = data['labels']
+        self.fail = data['fail']
+        self.first_child = []
+        first = 1
+        for count in counts:
+            self.first_child.append(first)
+            first += count
+        self.first_child.append(first)
+        # Breadth-first numbering: a node's depth is one more than its parent's.
+        self.depth = [0] * len(counts)
+        for node, count in enumerate(counts):
+            start = self.first_child[node]
+            for child in range(start, start + count):
+                self.depth[child] = self.depth[node] + 1
+        value_of = dict(zip(data['terminals'], data['values']))
+        self.values = data['values']
+        # out[s]: the terminal node of the longest key that is a suffix of s.
+        self.out = [-1] * len(counts)
+        for node in range(1, len(counts)):
+            self.out[node] = node if node in value_of else self.out[self.fail[node]]
+        self.value_of = value_of
+
+    @classmethod
+    def load(cls, path: str) -> 'Automaton':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def child(self, node: int, ch: str) -> int:
+        lo, hi = self.first_child[node], self.first_child[node + 1]
+        i = bisect.bisect_left(self.labels, ch, lo - 1, hi - 1)
+        if i < hi - 1 and self.labels[i] == ch:
+            return i + 1
+        return -1
+
+    def step(self, node: int, ch: str) -> int:
+        while True:
+            nxt = self.child(node, ch)
+            if nxt >= 0:
+                return nxt
+            if node == 0:
+                return 0
+            node = self.fail[node]
+
+    def find(self, text: str):
+        """Yield ``(start, end, replacement)`` for each leftmost-longest match."""
+        folded = fold(text)
+        n = len(folded)
+        i = 0
+        while i < n:
+            node, pending, j = 0, None, i
+            while j < n:
+                node = self.step(node, folded[j])
+                j += 1
+                terminal = self.out[node]
+                if terminal >= 0:
+                    start = j - self.depth[terminal]
+                    if pending is None or start <= pending[0]:
+                        pending = (start, j, terminal)
+                # No match still in progress can start at or before the pending one.
+                if pending is not None and j - self.depth[node] > pending[0]:
+                    break
+            if pending is None:
+                return
+            yield pending[0], pending[1], self.value_of[pending[2]]
+            i = pending[1]
+
+    def translate(self, text: str) -> str:
+        pieces = []
+        last = 0
+        for start, end, replacement in self.find(text):
+            pieces.append(text[last:start])
+            pieces.append(expand_replacement(replacement, text, start, end))
+            last = end
+        pieces.append(text[last:])
+        return ''.join(pieces)
+
+
+def load_bundle(locale: str, dist_root: str = DIST_DIR) -> dict:
+    with open(os.path.join(dist_dir(locale, dist_root), 'bundle.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_automaton(locale: str, dist_root: str = DIST_DIR) -> dict:
+    """Compile ``dist/<locale>/bundle.json`` into ``automaton.json``; return the automaton."""
+    data = compile_automaton(load_bundle(locale, dist_root))
+    write_if_changed(os.path.join(dist_dir(locale, dist_root), 'automaton.json'), dump_compact(data))
+    return data
+
+
+def check(locale: str, samples: int, dist_root: str = DIST_DIR, seed: int = 0) -> collections.Counter:
+    """Translate sample texts both ways and print the ones that differ."""
+    bundle = load_bundle(locale, dist_root)
+    automaton = Automaton.load(os.path.join(dist_dir(locale, dist_root), 'automaton.json'))
+    entries = js_sorted_entries(bundle)
+    keys = list(bundle)
+    rng = random.Random(seed)
+    # Single keys and short runs of keys joined by spaces, like table cells and sentences.
+    texts = [' '.join(rng.sample(keys, rng.randint(1, 3))) for _ in range(samples)]
+    counts = collections.Counter()
+    for text in texts:
+        expected = reference_translate(entries, text)
+        actual = automaton.translate(text)
+        counts['same' if expected == actual else 'different'] += 1
+        if expected != actual and counts['different'] <= 5:
+            print(f'{text!r}\n  regex chain: {expected!r}\n  automaton:   {actual!r}')
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build')
+    build.add_argument('--locale', nargs='+', choices=sorted(LOCALES), default=list(LOCALES))
+    build.add_argument('--dist', default=DIST_DIR)
+    compare = sub.add_parser('check', help='compare against the chained regexes of translateText')
+    compare.add_argument('locale', choices=sorted(LOCALES))
+    compare.add_argument('--samples', type=int, default=300)
+    compare.add_argument('--dist', default=DIST_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        for locale in args.locale:
+            data = write_automaton(locale, args.dist)
+            print(f"{locale}: {len(data['values'])} keys, {len(data['child_counts'])} states")
+    else:
+        counts = check(args.locale, args.samples, args.dist)
+        print(f"{counts['same']} of {args.samples} sample texts translate identically")
+
+
+if __name__ == '__main__':
+    main()
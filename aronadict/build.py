@@ -0,0 +1,397 @@
+"""Rebuild every dictionary of every locale in a single process.
+
+    python -m aronadict.build [--locale jpn zh_tw] [--out ROOT] [--force] [--bundle]
+                              [--encoding json json-min strtab.gz ...]
+                              [--record [NAME] | --replay NAME]
+                              [--threads 8] [--processes 4] [--workers 1] [--timings] [--trace FILE]
+
+The distinct upstream documents needed by all selected extractors are
+fetched once, concurrently, through the shared cache, parsed once, and each
+parsed document is handed to every extractor that reads it.  Each schaledb
+dataset is joined across all locales once (see :mod:`aronadict.spec`) and
+every field mapping is a projection of that join.  Fetching, parsing,
+extracting and writing form one dependency graph (see :func:`build`), so
+each extractor starts as soon as its own sources are in, and the build ends
+by printing its critical path and slowest steps; ``--trace`` also records
+the fetch, decode, parse, transform and write stages of every extractor (see
+:mod:`aronadict.trace`).  Outputs are written
+straight into JPN-json/ and zh_TW-json/ (or the same folders under ROOT),
+except the build-only :data:`aronadict.extractors.DIST_OUTPUTS`, which go to
+dist/<locale>/.
+
+Builds are incremental: an extractor whose upstream inputs and code are
+unchanged since the last build (see :mod:`aronadict.manifest`) is skipped
+without parsing anything, and a file is only rewritten when its bytes differ.
+"""
+import argparse
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+
+from . import dag, extractors, trace
+from .aiofetch import PER_HOST, FetchEngine, format_report, make_session
+from .automaton import write_automaton
+from .bundle import build_bundle
+from .extractors import Rows
+from .fetch import REPO_ROOT, get_cache
+from .formats import codec, encoded_name
+from .fuzzy import write_index
+from .interned import write_interned
+from .jsonstream import iter_rows
+from .manifest import BuildManifest, fingerprint
+from .output import write_if_changed
+from .shards import build_shards
+from .snapshot import make_cache
+from .sources import LOCALES, SOURCE_LANG, dist_dir, json_dir
+from .spec import Table, load_table, table_urls
+from .templates import skill_templates
+
+
+class Sources:
+    """Fetches and parses each upstream document, and joins each dataset, at most once per build."""
+
+    def __init__(self, cache=None, langs=()):
+        self.cache = cache or get_cache()
+        self.langs = list(langs)
+        self.meta = {}
+        self._parsed = {}
+
+    def fetch(self, url: str) -> dict:
+        if url not in self.meta:
+            self.meta[url] = self.cache.fetch(url)
+        return self.meta[url]
+
+    def path(self, url: str) -> str:
+        return self.cache.object_path(self.fetch(url)['sha256'])
+
+    def load(self, url: str):
+        """Parse ``url`` without keeping it."""
+        with trace.span('decode', url) as span:
+            with open(self.path(url), 'rb') as f:
+                data = f.read()
+            span.bytes_in = len(data)
+            text = data.decode('utf-8-sig')
+            span.bytes_out = len(text)
+        del data
+        with trace.span('parse', url, len(text)):
+            return json.loads(text)
+
+    def get(self, url: str):
+        if url not in self._parsed:
+            self._parsed[url] = self.load(url)
+        return self._parsed[url]
+
+    def rows(self, url: str, fields):
+        return read_rows(self.path(url), fields, url)
+
+    def table(self, dataset: str, root: tuple):
+        key = ('table', dataset, root)
+        if key not in self._parsed:
+            self._parsed[key] = load_table(dataset, root, self.langs, self.get)
+        return self._parsed[key]
+
+    def resolve(self, source):
+        if isinstance(source, Rows):
+            return self.rows(source.url, source.fields)
+        if isinstance(source, Table):
+            return self.table(source.dataset, source.root)
+        return self.get(source)
+
+
+def plan(locales, workers: int = 1) -> list:
+    return [(locale,) + job for locale in locales for job in extractors.jobs(locale, workers)]
+
+
+def output_dir(locale: str, output: str, root: str = REPO_ROOT) -> str:
+    """The folder ``output`` of ``locale`` is written to under ``root``.
+
+    :data:`extractors.DIST_OUTPUTS` go to ``root/dist/<locale>/``, everything
+    else to the locale's ``*-json`` folder.
+    """
+    if output in extractors.DIST_OUTPUTS:
+        return dist_dir(locale, os.path.join(root, 'dist'))
+    return json_dir(locale, root)
+
+
+def table_langs(steps) -> list:
+    """Every language any :class:`Table` source of ``steps`` reads, source language first."""
+    langs = [lang for step in steps for src in step[3] if isinstance(src, Table) for lang in src.langs]
+    return list(dict.fromkeys(sorted(langs, key=lambda lang: lang != SOURCE_LANG)))
+
+
+def source_urls(source) -> list:
+    if isinstance(source, Rows):
+        return [source.url]
+    if isinstance(source, Table):
+        return table_urls(source)
+    return [source]
+
+
+# A Rows source handed to an extractor as the cached file it streams from, so
+# that it can be read in a worker process.
+RowsFile = collections.namedtuple('RowsFile', 'path fields url')
+
+# Extractors worth a worker process: regex cleaning of every skill level and
+# merging levels into one row.
+CPU_BOUND = {extractors.skill_descriptions, extractors.skill_desc_one_row, skill_templates}
+
+
+def read_rows(path: str, fields, url: str = None):
+    with open(path, encoding='utf-8-sig') as f:
+        yield from trace.stream(f, lambda fp: iter_rows(fp, fields), url or path)
+
+
+def call_extractor(func, args, kwargs, name: str = None):
+    args = [read_rows(arg.path, arg.fields, arg.url) if isinstance(arg, RowsFile) else arg for arg in args]
+    with trace.span('transform', name or func.__name__):
+        return func(*args, **kwargs)
+
+
+def table_name(source: Table) -> str:
+    return f"{source.dataset}{''.join('/' + part for part in source.root)}"
+
+
+def table_node(source: Table) -> str:
+    return f'parse {table_name(source)}'
+
+
+def join_table(source: Table, langs, load):
+    with trace.span('parse', table_name(source)):
+        return load_table(source.dataset, source.root, langs, load)
+
+
+def trace_groups(steps, langs) -> dict:
+    """``{'locale/output': span names}``: the documents each extractor reads, and its own spans."""
+    groups = {}
+    for locale, output, _, job_sources, _ in steps:
+        names = []
+        for src in job_sources:
+            if isinstance(src, Table):
+                names += table_urls(src._replace(langs=langs)) + [table_name(src)]
+            else:
+                names += source_urls(src)
+        groups[f'{locale}/{output}'] = names + [f'{locale}/{output}']
+    return groups
+
+
+def build(locales=tuple(LOCALES), out_root: str = REPO_ROOT, sources: Sources = None,
+          engine: FetchEngine = None, manifest: BuildManifest = None, force: bool = False,
+          encodings=('json',), threads: int = dag.THREADS, processes: int = dag.PROCESSES,
+          workers: int = 1) -> tuple:
+    """Run every extractor of ``locales``; return ``(results, schedule)``.
+
+    ``results`` has ``(locale, output, entries, status)`` per file and
+    ``schedule`` is the :class:`aronadict.dag.Schedule` with every node's
+    timing.  Each output is written once per name in ``encodings`` (see
+    :mod:`aronadict.formats`).  ``status`` is ``'written'``, ``'unchanged'``
+    (rebuilt to identical bytes) or ``'skipped'`` (inputs unchanged, extractor
+    not run).
+
+    The work is a graph (see :mod:`aronadict.dag`): one fetch node per
+    upstream URL, one parse node per joined dataset or plain document, then
+    an extract and a write node per output, so the two locales and all
+    extractors proceed as soon as their own sources are in.  :data:`CPU_BOUND`
+    extractors run on ``processes`` worker processes, everything else on
+    ``threads`` threads; the skill-description extractors among them also
+    clean their texts over ``workers`` processes of their own (see
+    :func:`aronadict.extractors.clean_texts`).  A parse or extract node whose
+    outputs are all current is skipped, and a parsed document is dropped
+    after the last extractor that reads it.
+    """
+    codecs = {name: codec(name) for name in encodings}
+    engine = engine or FetchEngine()
+    sources = sources or Sources(engine.cache)
+    manifest = manifest or BuildManifest()
+    steps = plan(locales, workers)
+    sources.langs = table_langs(steps)
+    engine.stats = []
+    graph = dag.Graph()
+    lock = threading.Lock()
+
+    def fetch(url):
+        with trace.span('fetch', url) as span:
+            stat = engine.fetch_blocking(url)
+            span.bytes_in, span.bytes_out = stat.wire_bytes, stat.size
+        return sources.path(url)
+
+    for step in steps:
+        for src in step[3]:
+            for url in source_urls(src._replace(langs=sources.langs) if isinstance(src, Table) else src):
+                if f'fetch {url}' not in graph:
+                    graph.add(f'fetch {url}', fetch, url)
+
+    def job_urls(i):
+        return [url for src in steps[i][3] for url in source_urls(src)]
+
+    def out_paths(i):
+        locale, output = steps[i][:2]
+        return {name: os.path.join(output_dir(locale, output, out_root), encoded_name(output, name))
+                for name in encodings}
+
+    def job_inputs(i):
+        return {url: sources.fetch(url)['sha256'] for url in job_urls(i)}
+
+    stale = {}
+
+    def is_stale(i):
+        if i not in stale:
+            func, kwargs = steps[i][2], steps[i][4]
+            stale[i] = force or not all(manifest.is_current(path, job_inputs(i), fingerprint(func, kwargs))
+                                        for path in out_paths(i).values())
+        return stale[i]
+
+    users = collections.defaultdict(list)
+    for i, step in enumerate(steps):
+        for src in step[3]:
+            if isinstance(src, Table):
+                users[table_node(src)].append(i)
+            elif not isinstance(src, Rows):
+                users[f'parse {src}'].append(i)
+    for i, step in enumerate(steps):
+        for src in step[3]:
+            name = table_node(src) if isinstance(src, Table) else f'parse {src}'
+            if isinstance(src, Rows) or name in graph:
+                continue
+            # Deciding whether any reader is stale needs all of their inputs.
+            deps = [f'fetch {url}' for j in users[name] for url in job_urls(j)]
+            if isinstance(src, Table):
+                urls = table_urls(src._replace(langs=sources.langs))
+                graph.add(name, join_table, src, sources.langs, sources.load,
+                          deps=deps + [f'fetch {url}' for url in urls],
+                          when=lambda name=name: any(is_stale(j) for j in users[name]))
+            else:
+                graph.add(name, sources.load, src, deps=deps,
+                          when=lambda name=name: any(is_stale(j) for j in users[name]))
+
+    def write(i, mapping):
+        locale, output, func, _, kwargs = steps[i]
+        paths = out_paths(i)
+        if mapping is None:
+            return locale, output, manifest.entries(next(iter(paths.values()))), 'skipped'
+        inputs, extractor = job_inputs(i), fingerprint(func, kwargs)
+        written = False
+        with trace.span('write', f'{locale}/{output}') as span:
+            for name, path in paths.items():
+                data = codecs[name][1](mapping)
+                span.bytes_out += len(data)
+                written |= write_if_changed(path, data)
+                with lock:
+                    manifest.record(path, inputs, extractor, hashlib.sha256(data).hexdigest(), len(mapping))
+        return locale, output, len(mapping), 'written' if written else 'unchanged'
+
+    for i, (locale, output, func, job_sources, kwargs) in enumerate(steps):
+        args = []
+        for src in job_sources:
+            if isinstance(src, Rows):
+                args.append(RowsFile(dag.Ref(f'fetch {src.url}'), src.fields, src.url))
+            else:
+                args.append(dag.Ref(table_node(src) if isinstance(src, Table) else f'parse {src}'))
+        mapping = graph.add(f'extract {locale}/{output}', call_extractor, func, args, kwargs, f'{locale}/{output}',
+                            kind='cpu' if func in CPU_BOUND else 'io',
+                            deps=[f'fetch {url}' for url in job_urls(i)], when=lambda i=i: is_stale(i))
+        graph.add(f'write {locale}/{output}', write, i, mapping)
+
+    schedule = dag.run(graph, threads, processes)
+    manifest.save()
+    results = [schedule.results[f'write {locale}/{output}'] for locale, output, *_ in steps]
+    return results, schedule
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locale', nargs='+', choices=sorted(LOCALES), default=list(LOCALES))
+    parser.add_argument('--out', default=REPO_ROOT,
+                        help='folder that receives JPN-json/ and zh_TW-json/ (default: the repository)')
+    parser.add_argument('--per-host', type=int, default=PER_HOST,
+                        help='concurrent requests allowed per upstream host')
+    parser.add_argument('--fetch-report', action='store_true',
+                        help='print latency and bytes for every upstream URL')
+    parser.add_argument('--force', action='store_true',
+                        help='run every extractor even if its inputs are unchanged')
+    parser.add_argument('--encoding', nargs='+', default=['json'], metavar='NAME',
+                        help='encodings to write every dictionary in, e.g. json json-min strtab.gz '
+                             '(default: json; see aronadict.formats)')
+    parser.add_argument('--bundle', action='store_true',
+                        help='also write the merged per-locale bundle, its automaton, fuzzy index and '
+                             'interned string table and per-entity shards to dist/')
+    parser.add_argument('--threads', type=int, default=dag.THREADS,
+                        help='threads for fetching, parsing, light extractors and writing')
+    parser.add_argument('--processes', type=int, default=dag.PROCESSES,
+                        help='worker processes for the heavy extractors (0: run them on threads)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes each skill-description extractor cleans its texts over '
+                             '(tables below aronadict.extractors.PARALLEL_MIN texts stay serial)')
+    parser.add_argument('--timings', action='store_true', help='print the timing of every build step')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write a Chrome trace of every stage to FILE and print time, bytes and memory '
+                             'per stage and extractor (slower: memory is traced)')
+    snapshot = parser.add_mutually_exclusive_group()
+    snapshot.add_argument('--record', nargs='?', const=time.strftime('%Y%m%d-%H%M%S'), metavar='NAME',
+                          help='also save every upstream payload into snapshot NAME')
+    snapshot.add_argument('--replay', metavar='NAME',
+                          help='build from snapshot NAME without touching the network')
+    args = parser.parse_args(argv)
+
+    if args.record:
+        mode, name = 'record', args.record
+    elif args.replay:
+        mode, name = 'replay', args.replay
+    else:
+        mode, name = os.environ.get('ARONA_SNAPSHOT_MODE'), os.environ.get('ARONA_SNAPSHOT')
+    cache = make_cache(mode, name, session=make_session(args.per_host)) if mode else None
+
+    if args.trace:
+        trace.TRACER.start()
+    start = time.perf_counter()
+    engine = FetchEngine(cache, per_host=args.per_host)
+    sources = Sources(engine.cache)
+    for name in args.encoding:
+        try:
+            codec(name)
+        except ValueError as e:
+            parser.error(str(e))
+    results, schedule = build(args.locale, args.out, sources, engine, force=args.force,
+                              encodings=args.encoding, threads=args.threads, processes=args.processes,
+                              workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    for locale, output, count, status in results:
+        path = os.path.relpath(os.path.join(output_dir(locale, output, args.out), output), args.out)
+        print(f"{path.replace(os.sep, '/')}: {count} entries ({status})")
+    if args.fetch_report:
+        print(format_report(engine.stats))
+    statuses = collections.Counter(m['status'] for m in sources.meta.values())
+    downloaded = sum(m['wire_bytes'] for m in sources.meta.values())
+    print(f"{len(sources.meta)} upstream documents: {statuses[200]} downloaded ({downloaded} bytes), "
+          f"{statuses[304]} not modified, {statuses['replay']} replayed; {elapsed:.1f}s")
+    print(schedule.format(None if args.timings else 10))
+    if args.trace:
+        trace.TRACER.stop()
+        spans = trace.TRACER.drain()
+        trace.write_chrome_trace(args.trace, spans, start)
+        print(trace.summary(spans, trace_groups(plan(args.locale), sources.langs)))
+        print(f'{len(spans)} spans written to {args.trace}')
+    if mode == 'record':
+        print(f'recorded snapshot {name!r}')
+    if args.bundle:
+        for locale in args.locale:
+            dist_root = os.path.join(args.out, 'dist')
+            report = build_bundle(locale, args.out, dist_root)
+            print(f"dist/{locale}/bundle.json: {report['entries_out']} entries, "
+                  f"{len(report['conflicts'])} conflicting keys")
+            automaton = write_automaton(locale, dist_root)
+            print(f"dist/{locale}/automaton.json: {len(automaton['child_counts'])} states")
+            index = write_index(locale, dist_root)
+            print(f"dist/{locale}/fuzzy.json: {len(index.postings)} {index.q}-grams")
+            interned = write_interned(locale, args.out, dist_root)
+            print(f"dist/{locale}/interned.json: {len(interned['strings'])} distinct strings")
+            index = build_shards(locale, sources, dist_root)
+            print(f"dist/{locale}/shards/: {len(index['shards'])} shards, "
+                  f"{index['common']['entries']} entries in common.json")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Merge a locale's dictionaries into one bundle, the way the extension would.
+
+    python -m aronadict.bundle [--locale jpn zh_tw] [--src ROOT] [--out DIR] [--drop-empty]
+
+``Dictionary.fetchDictionaryFiles`` in content.js fetches :data:`LOAD_ORDER`
+from the locale folder and ``Object.assign``s them in that order, so a key in
+a later file silently replaces the same key from an earlier one.  This module
+applies the same precedence once, at build time, and writes
+``dist/<locale>/``:
+
+``bundle.json``
+    The merged dictionary, compact.  A key keeps the value of its last
+    appearance and the position of its first, which is ``Object.assign``
+    order for every key except integer-like ones: a JavaScript object lists
+    those first, in ascending order, however they were inserted, and does
+    so again when it parses the file (see :func:`automaton.js_entries`).
+    Entries whose value equals the key are dropped; they never change the
+    text.
+``version.json``, ``deltas/``
+    The bundle's version and content hash, and the delta from each version
+    to the next (see :mod:`aronadict.versions`).
+``conflicts.json``
+    Every key that files disagree on, with each file's value in load order
+    and the winning file, plus counts of duplicates and dropped entries.
+
+The hand-maintained ``dictionary.json`` (:data:`SHARED_FILES`) is read
+from the repository when ``--src`` has no copy, and is never left out.
+
+Empty values (crafting.json blanks its node names and ``/``) are kept by
+default: ``translateText`` deletes the matched text for them, so they are
+not no-ops.  ``--drop-empty`` removes them too.
+"""
+import argparse
+import json
+import os
+
+from .fetch import REPO_ROOT
+from .output import dump_compact, write_if_changed
+from .sources import DIST_DIR, LOCALES, dist_dir, json_dir
+from .versions import stamp
+
+# Keep in sync with the file list in Dictionary.fetchDictionaryFiles (content.js).
+LOAD_ORDER = [
+    'dictionary.json',
+    'students_mapping.json',
+    'Event.json',
+    'Club.json',
+    'School.json',
+    'CharacterSSRNew.json',
+    'FamilyName_mapping.json',
+    'Hobby_mapping.json',
+    'skill_name_mapping.json',
+    'skill_Desc_mapping.json',
+    'furniture_name_mapping.json',
+    'furniture_Desc_mapping.json',
+    'item_name_mapping.json',
+    'item_Desc_mapping.json',
+    'equipment_Desc_mapping.json',
+    'equipment_name_mapping.json',
+    'stages_name_mapping.json',
+    'stages_Event_mapping.json',
+    'ArmorType.json',
+    'TacticRole.json',
+    'ProfileIntroduction.json',
+    'WeaponNameMapping.json',
+    'crafting.json',
+    'skill_Desc_one_row.json',
+    'StatusMessage.json',
+]
+
+
+# Maintained by hand in the repository, not written by the builder, so a build
+# into another root (``--out``) has no copy of its own.
+SHARED_FILES = {'dictionary.json'}
+
+
+def load_files(folder: str, names=LOAD_ORDER):
+    """Return ``[(name, mapping)]`` for the files present and the names that are missing."""
+    files, missing = [], []
+    for name in names:
+        try:
+            with open(os.path.join(folder, name), encoding='utf-8-sig') as f:
+                files.append((name, json.load(f)))
+        except FileNotFoundError:
+            missing.append(name)
+    return files, missing
+
+
+def locale_files(locale: str, src_root: str = REPO_ROOT):
+    """:func:`load_files` of the locale folder under ``src_root``.
+
+    :data:`SHARED_FILES` it lacks are read from the repository's locale
+    folder instead; one missing there too raises :exc:`FileNotFoundError`, so
+    a bundle never goes out without them.
+    """
+    files, missing = load_files(json_dir(locale, src_root))
+    shared = [name for name in missing if name in SHARED_FILES]
+    if not shared:
+        return files, missing
+    found, absent = load_files(json_dir(locale), shared)
+    if absent:
+        raise FileNotFoundError(f"{', '.join(absent)} missing from {json_dir(locale, src_root)} "
+                                f"and {json_dir(locale)}")
+    loaded = dict(files + found)
+    files = [(name, loaded[name]) for name in LOAD_ORDER if name in loaded]
+    return files, [name for name in missing if name not in loaded]
+
+
+def merge(files, drop_empty: bool = False):
+    """Merge ``[(name, mapping)]`` with later files winning; return ``(bundle, report)``.
+
+    ``bundle`` is in first-appearance order; ``automaton.js_entries(bundle)``
+    gives the order the extension sees.
+    """
+    bundle = {}
+    sources = {}
+    total = 0
+    for name, mapping in files:
+        total += len(mapping)
+        for key, value in mapping.items():
+            bundle[key] = value
+            sources.setdefault(key, []).append((name, value))
+
+    conflicts = {}
+    duplicates = 0
+    for key, seen in sources.items():
+        if len(seen) > 1:
+            duplicates += len(seen) - 1
+            if len({value for _, value in seen}) > 1:
+                conflicts[key] = {'winner': seen[-1][0], 'values': seen}
+
+    identity = [key for key, value in bundle.items() if key == value]
+    empty = [key for key, value in bundle.items() if value == ''] if drop_empty else []
+    for key in identity + empty:
+        del bundle[key]
+
+    report = {
+        'files': [name for name, _ in files],
+        'entries_in': total,
+        'entries_out': len(bundle),
+        'duplicates': duplicates,
+        'identity_dropped': len(identity),
+        'empty_dropped': len(empty),
+        'conflicts': conflicts,
+    }
+    return bundle, report
+
+
+def build_bundle(locale: str, src_root: str = REPO_ROOT, out_root: str = DIST_DIR, drop_empty: bool = False) -> dict:
+    """Write ``bundle.json`` and ``conflicts.json`` for ``locale``; return the report."""
+    files, missing = locale_files(locale, src_root)
+    bundle, report = merge(files, drop_empty)
+    report['missing'] = missing
+    out = dist_dir(locale, out_root)
+    path = os.path.join(out, 'bundle.json')
+    try:
+        with open(path, 'rb') as f:
+            previous = f.read()
+    except FileNotFoundError:
+        previous = None
+    data = dump_compact(bundle)
+    write_if_changed(path, data)
+    report['version'] = stamp(out, previous, data)['version']
+    write_if_changed(os.path.join(out, 'conflicts.json'),
+                     json.dumps(report, ensure_ascii=False, indent=1).encode('utf-8'))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locale', nargs='+', choices=sorted(LOCALES), default=list(LOCALES))
+    parser.add_argument('--src', default=REPO_ROOT, help='folder holding JPN-json/ and zh_TW-json/')
+    parser.add_argument('--out', default=DIST_DIR)
+    parser.add_argument('--drop-empty', action='store_true', help='also drop entries whose value is empty')
+    args = parser.parse_args(argv)
+
+    for locale in args.locale:
+        report = build_bundle(locale, args.src, args.out, args.drop_empty)
+        print(f"{locale}: {len(report['files'])} files, {report['entries_in']} entries -> "
+              f"{report['entries_out']} ({report['duplicates']} duplicates, "
+              f"{len(report['conflicts'])} conflicting keys, {report['identity_dropped']} key == value, "
+              f"{report['empty_dropped']} empty dropped), version {report['version']}")
+        for name in report['missing']:
+            print(f'  missing: {name}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Run single extractors from the command line.
+
+    python -m aronadict.cli LOCALE [OUTPUT ...] [--out DIR]
+
+Each script in JPN-python/ and zh_TW-python/ is a thin wrapper around
+:func:`run_extractor`; importing one does nothing.  :func:`extract` runs one
+extractor of :func:`aronadict.extractors.jobs` in-process and returns its
+mapping, for tests and benchmarks that want the transform without the
+writing.  With no OUTPUT, every dictionary of LOCALE that the extension
+loads is written, in one interpreter (not the build-only
+:data:`aronadict.extractors.DIST_OUTPUTS`).
+"""
+import argparse
+import os
+
+from .build import Sources, plan, table_langs
+from .extractors import DIST_OUTPUTS
+from .output import dump_mapping, write_if_changed
+from .sources import LOCALES
+
+
+def find_step(locale: str, output: str) -> tuple:
+    for step in plan([locale]):
+        if step[1] == output:
+            return step
+    raise KeyError(f'{locale} has no extractor for {output}')
+
+
+def extract(locale: str, output: str, sources: Sources = None) -> dict:
+    """Fetch the inputs of ``output`` for ``locale`` and return its mapping."""
+    step = find_step(locale, output)
+    _, _, func, job_sources, kwargs = step
+    if sources is None:
+        sources = Sources(langs=table_langs([step]))
+    return func(*[sources.resolve(src) for src in job_sources], **kwargs)
+
+
+def run_extractor(locale: str, output: str, out_dir: str = '.', sources: Sources = None) -> dict:
+    """Write ``output`` for ``locale`` into ``out_dir`` (the current folder, as start.bat expects)."""
+    mapping = extract(locale, output, sources)
+    write_if_changed(os.path.abspath(os.path.join(out_dir, output)), dump_mapping(mapping))
+    print(f'{len(mapping)} entries saved to {output}')
+    return mapping
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('locale', choices=sorted(LOCALES))
+    parser.add_argument('outputs', nargs='*', metavar='OUTPUT', help='e.g. skill_Desc_mapping.json (default: all)')
+    parser.add_argument('--out', default='.', help='folder to write into (default: the current folder)')
+    args = parser.parse_args(argv)
+
+    steps = plan([args.locale])
+    known = [step[1] for step in steps]
+    for output in args.outputs:
+        if output not in known:
+            parser.error(f'unknown output {output!r}; choose from {", ".join(known)}')
+    sources = Sources(langs=table_langs(steps))
+    for output in args.outputs or [output for output in known if output not in DIST_OUTPUTS]:
+        run_extractor(args.locale, output, args.out, sources)
+
+
+if __name__ == '__main__':
+    main()
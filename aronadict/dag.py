@@ -0,0 +1,196 @@
+"""Run a graph of dependent build steps on thread and process pools.
+
+A :class:`Graph` holds named nodes.  Each node is a function, its arguments
+and the nodes it depends on; a :class:`Ref` among the arguments (also inside
+lists and named tuples) is replaced by that node's result and makes it a
+dependency.  :func:`run` starts every node as soon as its dependencies have
+finished: ``'io'`` nodes on a thread pool, ``'cpu'`` nodes on a process pool
+(their function, arguments and result must pickle).  A node's ``when``
+predicate, if given, is checked just before it would start; when it is false
+the node is skipped and its result is ``None``.  While
+:data:`aronadict.trace.TRACER` is started, worker processes trace the nodes
+they run and their spans join the builder's.
+
+A node's result is dropped as soon as its last dependant has finished, so
+parsed documents do not outlive the extractors that read them.  The returned
+:class:`Schedule` keeps the results of the nodes nothing depends on, every
+node's start and end time and the critical path: the chain of dependencies
+whose durations add up to the most.
+"""
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+import time
+
+from . import trace
+
+Ref = collections.namedtuple('Ref', 'name')
+Node = collections.namedtuple('Node', 'name kind func args deps when')
+Timing = collections.namedtuple('Timing', 'name kind start end skipped')
+
+THREADS = 8
+CPUS = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+# On a single CPU, worker processes only add their start-up time.
+PROCESSES = min(4, CPUS) if CPUS > 1 else 0
+
+
+def refs(value) -> list:
+    if isinstance(value, Ref):
+        return [value.name]
+    if isinstance(value, (list, tuple)):
+        return [name for item in value for name in refs(item)]
+    return []
+
+
+def resolve(value, results: dict):
+    if isinstance(value, Ref):
+        return results[value.name]
+    if isinstance(value, list):
+        return [resolve(item, results) for item in value]
+    if isinstance(value, tuple):
+        items = [resolve(item, results) for item in value]
+        return type(value)._make(items) if hasattr(value, '_make') else tuple(items)
+    return value
+
+
+def timed_call(func, args, trace_memory=None):
+    """Call ``func(*args)``; with ``trace_memory`` set, trace it in this worker and return its spans too."""
+    start = time.perf_counter()
+    if trace_memory is None:
+        result, spans = func(*args), []
+    else:
+        result, spans = trace.worker_call(trace_memory, func, args)
+    return result, start, time.perf_counter(), spans
+
+
+class Graph:
+    def __init__(self):
+        self.nodes = {}
+
+    def add(self, name: str, func, *args, kind: str = 'io', deps=(), when=None) -> Ref:
+        """Add node ``name``; return a :class:`Ref` to its result."""
+        if name in self.nodes:
+            raise ValueError(f'duplicate node {name!r}')
+        if kind not in ('io', 'cpu'):
+            raise ValueError(f'unknown node kind {kind!r}')
+        all_deps = list(dict.fromkeys(refs(list(args)) + [d.name if isinstance(d, Ref) else d for d in deps]))
+        for dep in all_deps:
+            if dep not in self.nodes:
+                raise ValueError(f'{name!r} depends on unknown node {dep!r}')
+        self.nodes[name] = Node(name, kind, func, args, all_deps, when)
+        return Ref(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.nodes
+
+
+class Schedule:
+    def __init__(self, graph: Graph, results: dict, timings: dict, elapsed: float):
+        self.graph = graph
+        self.results = results
+        self.timings = timings
+        self.elapsed = elapsed
+
+    def duration(self, name: str) -> float:
+        timing = self.timings[name]
+        return timing.end - timing.start
+
+    def critical_path(self) -> list:
+        """Names along the dependency chain with the largest total duration."""
+        best = {}
+        for name, node in self.graph.nodes.items():  # insertion order is topological
+            prev = max(node.deps, key=lambda dep: best[dep][0], default=None)
+            total = self.duration(name) + (best[prev][0] if prev else 0.0)
+            best[name] = (total, prev)
+        if not best:
+            return []
+        name = max(best, key=lambda n: best[n][0])
+        path = []
+        while name is not None:
+            path.append(name)
+            name = best[name][1]
+        return path[::-1]
+
+    def format(self, limit: int = None) -> str:
+        path = self.critical_path()
+        total = sum(self.duration(name) for name in path)
+        lines = [f'critical path {total:.2f}s of {self.elapsed:.2f}s wall:']
+        lines += [f'  {self.duration(name) * 1000:8.0f} ms  {name}' for name in path]
+        ranked = sorted(self.timings.values(), key=lambda t: t.end - t.start, reverse=True)
+        shown = ranked if limit is None else ranked[:limit]
+        lines.append(f'{"kind":>4} {"start ms":>9} {"ms":>8}  node'
+                     + ('' if limit is None or limit >= len(ranked) else f'  ({limit} slowest of {len(ranked)})'))
+        for t in shown:
+            lines.append(f'{t.kind:>4} {t.start * 1000:9.0f} {(t.end - t.start) * 1000:8.0f}  '
+                         f'{t.name}{" (skipped)" if t.skipped else ""}')
+        return '\n'.join(lines)
+
+
+def run(graph: Graph, threads: int = THREADS, processes: int = PROCESSES) -> Schedule:
+    """Run every node of ``graph``; ``processes=0`` runs ``'cpu'`` nodes on the thread pool too."""
+    dependants = collections.defaultdict(list)
+    waiting = {}
+    for name, node in graph.nodes.items():
+        waiting[name] = len(node.deps)
+        for dep in node.deps:
+            dependants[dep].append(name)
+    remaining_users = {name: len(dependants[name]) for name in graph.nodes}
+
+    results = {}
+    timings = {}
+    origin = time.perf_counter()
+    use_processes = processes and any(node.kind == 'cpu' for node in graph.nodes.values())
+    thread_pool = concurrent.futures.ThreadPoolExecutor(threads)
+    process_pool = (concurrent.futures.ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+                    if use_processes else None)
+    # Spans recorded in worker processes come back with their results.
+    worker_trace = trace.TRACER.memory if trace.TRACER.enabled else None
+    running = {}
+    ready = collections.deque(name for name, count in waiting.items() if count == 0)
+
+    def finish(name: str, result, start: float, end: float, skipped: bool) -> None:
+        node = graph.nodes[name]
+        timings[name] = Timing(name, node.kind, start - origin, end - origin, skipped)
+        results[name] = result
+        for dep in node.deps:
+            remaining_users[dep] -= 1
+            if remaining_users[dep] == 0:
+                del results[dep]
+        for user in dependants[name]:
+            waiting[user] -= 1
+            if waiting[user] == 0:
+                ready.append(user)
+
+    try:
+        while ready or running:
+            while ready:
+                name = ready.popleft()
+                node = graph.nodes[name]
+                if node.when is not None and not node.when():
+                    now = time.perf_counter()
+                    finish(name, None, now, now, True)
+                    continue
+                args = resolve(list(node.args), results)
+                if node.kind == 'cpu' and process_pool:
+                    future = process_pool.submit(timed_call, node.func, args, worker_trace)
+                else:
+                    future = thread_pool.submit(timed_call, node.func, args)
+                running[future] = name
+            if not running:
+                break
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result, start, end, spans = future.result()
+                trace.TRACER.extend(spans)
+                finish(name, result, start, end, False)
+    except BaseException:
+        for future in running:
+            future.cancel()
+        raise
+    finally:
+        thread_pool.shutdown(wait=True, cancel_futures=True)
+        if process_pool:
+            process_pool.shutdown(wait=True, cancel_futures=True)
+    return Schedule(graph, results, timings, time.perf_counter() - origin)
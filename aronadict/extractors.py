@@ -0,0 +1,258 @@
+"""Extraction functions shared by every locale.
+
+Each function takes already-parsed upstream documents and returns the
+KR -> target mapping that one of the ``*-python`` scripts writes; the plain
+field-to-field mappings are declared in :mod:`aronadict.spec` instead.  They do no
+I/O, so the builder can run all of them against a single parsed copy of each
+source.  The ba-data Excel tables are passed as an iterable of ``DataList``
+rows (see :class:`Rows`) so they can be streamed instead of parsed whole.
+"""
+import collections
+import re
+
+from .sources import LOCALES, crafting_url, profile_table_url, schaledb_url, skill_table_url
+from .spec import MAPPINGS, mapping_job
+
+# A job argument that is streamed row by row, projected to ``fields``.
+Rows = collections.namedtuple('Rows', 'url fields')
+
+
+def crafting_blanks(crafting: dict) -> dict:
+    """JPN: blank out every crafting node name (and the "/" separator)."""
+    result = {}
+    for node in crafting.get("Nodes", []):
+        result[node.get("NameKr")] = ""
+    result["/"] = ""
+    return result
+
+
+def crafting_names(crafting: dict, suffix: str) -> dict:
+    """zh_TW: translate node names that differ from JP, blank the rest."""
+    result = {}
+    for node in crafting.get("Nodes", []):
+        name_kr = node.get("NameKr", "")
+        name_tgt = node.get("Name" + suffix, "")
+        name_jp = node.get("NameJp", "")
+        if name_jp == name_tgt:
+            result[name_kr] = ""
+        else:
+            result[name_kr] = name_tgt
+            result[name_jp] = ""
+    result["/"] = ""
+    return result
+
+
+def status_messages(rows, suffix: str) -> dict:
+    mapping = {}
+    for entry in rows:
+        kr = entry.get("StatusMessageKr", "").strip()
+        tgt = entry.get("StatusMessage" + suffix, "").strip()
+        if kr and tgt:
+            mapping[kr] = tgt
+    return mapping
+
+
+# [xxx] tags never span lines, so removing them and the line breaks is one scan.
+TAG_OR_NEWLINE = re.compile(r'\[.*?\]|\n')
+SLASH_BEFORE_TEXT = re.compile(r'/(\S)')
+# Below this many texts a process pool does not clearly pay off.  In
+# benchmarks/clean_text.py a serial run cleans 75-110k rows/s (5-7 us a text),
+# and each spawned worker adds about 0.25 s (2 workers: +0.6 s, 4 workers:
+# +1.1 s at 21.6k texts on one CPU).  Four workers on four cores reach 1.5x
+# once the serial time is 2.4 times that start-up, around 150k texts.  Real
+# skill tables (20-40k texts) stay serial.
+PARALLEL_MIN = 150000
+
+
+def clean_text(text: str) -> str:
+    # 移除所有 [xxx] 標籤並去除換行
+    if '[' in text or '\n' in text:
+        text = TAG_OR_NEWLINE.sub('', text)
+    # 收斂多重空格並去除首尾空白（與 re.sub(r'\s+', ' ', ...).strip() 相同）
+    text = ' '.join(text.split())
+    # 如果 / 後面緊接文字，就插入空白；"//x" 的第二個 / 已被吃掉，結果是 "/ /x"
+    if '/' in text:
+        text = SLASH_BEFORE_TEXT.sub(r'/ \1', text)
+    return text
+
+
+def clean_chunk(texts: list) -> list:
+    return [clean_text(text) for text in texts]
+
+
+def clean_texts(texts: list, workers: int = 1) -> list:
+    """:func:`clean_text` of every text, in chunks over ``workers`` processes.
+
+    Falls back to a plain loop for one worker or fewer than
+    :data:`PARALLEL_MIN` texts.
+    """
+    if workers <= 1 or len(texts) < PARALLEL_MIN:
+        return clean_chunk(texts)
+    import concurrent.futures
+    import multiprocessing
+
+    size = -(-len(texts) // (workers * 4))
+    chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+    with concurrent.futures.ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return [text for chunk in pool.map(clean_chunk, chunks) for text in chunk]
+
+
+def skill_descriptions(rows, suffix: str, workers: int = 1) -> dict:
+    pairs = []
+    for item in rows:
+        kr = item.get("DescriptionKr", "")
+        tgt = item.get("Description" + suffix, "")
+        if kr and tgt:
+            pairs += (kr, tgt)
+    cleaned = clean_texts(pairs, workers)
+    return dict(zip(cleaned[0::2], cleaned[1::2]))
+
+
+def ex_skill_names(students: dict) -> set:
+    return {info['Skills']['Ex']['Name']
+            for info in students.values()
+            if info.get('Skills', {}).get('Ex', {}).get('Name')}
+
+
+def skill_levels(rows, ex_names: set, suffix: str, workers: int = 1):
+    """Yield ``(skill, kr, target)`` for every described row, cleaned.
+
+    ``skill`` is the row's Korean skill name (``None`` if it has none).  Only
+    the first 5 rows of each EX skill are kept.
+    """
+    counters = collections.defaultdict(int)
+    skills, texts = [], []
+    for item in rows:
+        kr = item.get('DescriptionKr')
+        tgt = item.get('Description' + suffix)
+        name = item.get('Name' + suffix)
+        if not kr or not tgt:
+            continue
+        if name in ex_names:
+            if counters[name] >= 5:
+                continue
+            counters[name] += 1
+        skills.append(item.get('NameKr') or None)
+        texts += (kr, tgt)
+    cleaned = clean_texts(texts, workers)
+    yield from zip(skills, cleaned[0::2], cleaned[1::2])
+
+
+NUMBER = re.compile(r'(\d+(?:\.\d+)?%?)')
+PLACEHOLDER = '{num}'
+
+
+def extract_numbers_and_mask(text):
+    """
+    Extracts numbers (int, float, percentage) from text and returns a masked version
+    with placeholders and the list of extracted numbers.
+    """
+    parts = NUMBER.split(text)
+    return PLACEHOLDER.join(parts[0::2]), parts[1::2]
+
+
+def merge_number_sequences(sequences):
+    """
+    Merges multiple lists of numbers.
+    Example: [['10', '20'], ['15', '20']] -> ['10/15', '20']
+    """
+    if not sequences:
+        return []
+    return [nums[0] if len(set(nums)) == 1 else '/'.join(nums) for nums in zip(*sequences)]
+
+
+def replace_placeholders(masked_text, numbers):
+    """
+    Replaces '{num}' placeholders in the masked text with the provided numbers sequentially.
+    """
+    parts = masked_text.split(PLACEHOLDER)
+    out = []
+    for i, part in enumerate(parts):
+        out.append(part)
+        if i < len(numbers):
+            out.append(numbers[i])
+    return ''.join(out)
+
+
+def group_levels(entries) -> dict:
+    """Collapse every level variant of a skill into one "10/15/20" entry, wherever its rows appear.
+
+    ``entries`` are ``(skill, kr, target)`` triples.  Rows are grouped through
+    a hash index on the skill plus the masked key and value, so rows without
+    a skill group on their masked text alone.  A group's numbers are listed
+    in row order, which is level order in the table (a skill's numbers may go
+    up or down with its level), and the merged entry takes the place of the
+    group's first row.  When groups of several skills produce the same
+    Korean text, it is written once, with the value most of their rows agree
+    on (the first group's on a tie).
+    """
+    groups = {}
+    masks = {}
+    for skill, kr, tgt in entries:
+        for text in (kr, tgt):
+            if text not in masks:
+                masks[text] = extract_numbers_and_mask(text)
+        masked_key, key_nums = masks[kr]
+        masked_value, value_nums = masks[tgt]
+        shape = (skill, masked_key, masked_value, len(key_nums), len(value_nums))
+        groups.setdefault(shape, {}).setdefault((kr, tgt), (key_nums, value_nums))
+
+    votes = {}
+    for (_, masked_key, masked_value, _, _), members in groups.items():
+        if len(members) == 1:
+            (kr, tgt), = members
+        else:
+            numbers = list(members.values())
+            kr = replace_placeholders(masked_key, merge_number_sequences([nums[0] for nums in numbers]))
+            tgt = replace_placeholders(masked_value, merge_number_sequences([nums[1] for nums in numbers]))
+        counts = votes.setdefault(kr, {})
+        counts[tgt] = counts.get(tgt, 0) + len(members)
+    # max() keeps the first of equal counts, and dicts keep first-seen order.
+    return collections.OrderedDict((kr, max(counts, key=counts.get)) for kr, counts in votes.items())
+
+
+def skill_desc_one_row(rows, students: dict, suffix: str, workers: int = 1) -> dict:
+    """Skill levels merged into one row each; ``students`` is the target-language document."""
+    return group_levels(skill_levels(rows, ex_skill_names(students), suffix, workers))
+
+
+# Outputs content.js never loads.  They go to dist/<locale>/ with the other
+# build artifacts instead of the *-json folder packaged with the extension.
+DIST_OUTPUTS = {'skill_Desc_template.json'}
+
+
+def jobs(locale: str, workers: int = 1) -> list:
+    """Return ``(output file, function, sources, keyword arguments)`` for ``locale``.
+
+    Positional arguments of each function are the parsed documents at the
+    listed URLs, in order; a :class:`Rows` source is passed as a row iterator
+    and a :class:`~aronadict.spec.Table` source as an aligned table.  The
+    plain field mappings come from :data:`aronadict.spec.MAPPINGS`.  The
+    skill-description extractors clean their texts over ``workers``
+    processes (see :func:`clean_texts`).
+    """
+    from .templates import skill_templates
+
+    loc = LOCALES[locale]
+    lang, suffix = loc['lang'], loc['suffix']
+    skill_table = skill_table_url(locale)
+    if locale == 'jpn':
+        crafting = ('crafting.json', crafting_blanks, [crafting_url()], {})
+    else:
+        crafting = ('crafting.json', crafting_names, [crafting_url()], {'suffix': suffix})
+
+    return [mapping_job(spec, lang) for spec in MAPPINGS] + [
+        crafting,
+        ('skill_Desc_mapping.json', skill_descriptions,
+         [Rows(skill_table, ('DescriptionKr', 'Description' + suffix))], {'suffix': suffix, 'workers': workers}),
+        ('skill_Desc_template.json', skill_templates,
+         [Rows(skill_table, ('DescriptionKr', 'Description' + suffix))], {'suffix': suffix, 'workers': workers}),
+        ('skill_Desc_one_row.json', skill_desc_one_row,
+         # Only the target-language document, not the joined table: this job
+         # runs in a worker process and its arguments are pickled.
+         [Rows(skill_table, ('NameKr', 'DescriptionKr', 'Description' + suffix, 'Name' + suffix)),
+          schaledb_url(lang, 'students')],
+         {'suffix': suffix, 'workers': workers}),
+        ('StatusMessage.json', status_messages,
+         [Rows(profile_table_url(locale), ('StatusMessageKr', 'StatusMessage' + suffix))], {'suffix': suffix}),
+    ]
@@ -0,0 +1,160 @@
+"""Shared fetch layer for every upstream download.
+
+Every upstream download goes through :class:`HttpCache` (see
+:func:`get_cache`) instead of calling ``requests.get`` directly.  Response
+bodies are stored content-addressed (by SHA-256) under
+``.build/http-cache/objects`` and every URL keeps a small metadata record
+with its ETag / Last-Modified validators, so a refresh sends conditional GETs
+and only downloads bodies that changed.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR = os.path.join(REPO_ROOT, '.build')
+CACHE_DIR = os.environ.get('ARONA_CACHE_DIR', os.path.join(BUILD_DIR, 'http-cache'))
+
+TIMEOUT = 60
+CHUNK_SIZE = 1 << 16
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def write_json_atomic(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+class HttpCache:
+    """Content-addressed on-disk cache keyed by URL.
+
+    ``urls/<sha256(url)>.json`` holds the validators and the digest of the
+    last body seen for that URL; ``objects/<aa>/<digest>`` holds the body.
+    Identical bodies served under different URLs are stored once.
+    """
+
+    def __init__(self, root: str = CACHE_DIR, session: requests.Session = None):
+        self.root = root
+        self.session = session or requests.Session()
+        # URLs already revalidated by this process are not asked again.
+        self._validated = {}
+
+    def meta_path(self, url: str) -> str:
+        return os.path.join(self.root, 'urls', url_key(url) + '.json')
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def lookup(self, url: str):
+        """Return the stored metadata for ``url`` if its body is on disk."""
+        try:
+            with open(self.meta_path(url), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self.object_path(meta['sha256'])):
+            return None
+        return meta
+
+    def store(self, url: str, chunks, etag=None, last_modified=None) -> dict:
+        """Write a body given as an iterable of byte chunks and record it for ``url``."""
+        objects = os.path.join(self.root, 'objects')
+        os.makedirs(objects, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=objects, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        digest.update(chunk)
+                        size += len(chunk)
+                        f.write(chunk)
+            sha = digest.hexdigest()
+            target = self.object_path(sha)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        now = time.time()
+        meta = {
+            'url': url,
+            'sha256': sha,
+            'size': size,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+            'validated_at': now,
+        }
+        write_json_atomic(self.meta_path(url), meta)
+        return meta
+
+    def fetch(self, url: str) -> dict:
+        """Make sure the current body of ``url`` is cached and return its metadata.
+
+        The returned dict carries ``status``: 200 when a new body was
+        downloaded, 304 when the cached one was confirmed still current, and
+        ``wire_bytes``, the size of the transfer.
+        """
+        if url in self._validated:
+            return self._validated[url]
+
+        cached = self.lookup(url)
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        with self.session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+            if response.status_code == 304 and cached:
+                cached['validated_at'] = time.time()
+                write_json_atomic(self.meta_path(url), cached)
+                meta = dict(cached, status=304)
+            else:
+                response.raise_for_status()
+                meta = self.store(
+                    url,
+                    response.iter_content(CHUNK_SIZE),
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                )
+                meta['status'] = response.status_code
+            # Bytes actually read off the socket, before Content-Encoding is undone.
+            meta['wire_bytes'] = response.raw.tell()
+
+        self._validated[url] = meta
+        return meta
+
+    def path(self, url: str) -> str:
+        return self.object_path(self.fetch(url)['sha256'])
+
+
+_default_cache = None
+
+
+def get_cache() -> HttpCache:
+    """Return the process-wide cache, honouring ``ARONA_SNAPSHOT_MODE`` / ``ARONA_SNAPSHOT``."""
+    global _default_cache
+    if _default_cache is None:
+        mode = os.environ.get('ARONA_SNAPSHOT_MODE')
+        if mode:
+            from .snapshot import make_cache
+            _default_cache = make_cache(mode, os.environ['ARONA_SNAPSHOT'])
+        else:
+            _default_cache = HttpCache()
+    return _default_cache
+
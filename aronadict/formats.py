@@ -0,0 +1,145 @@
+"""On-disk encodings for dictionary files.
+
+``json``
+    ``json.dump(..., indent=4)``, what the scripts write and content.js loads.
+``json-min``
+    The same JSON without whitespace.
+``strtab``
+    A length-prefixed string table: every distinct string once, then the
+    entries as pairs of indices into it.  All integers are unsigned LEB128::
+
+        b'ARDT' version=1
+        count  byte_length * count  utf-8 bytes of every string, concatenated
+        entries  (key_index, value_index << 1 | is_json) * entries
+
+    Values that are not strings (skill_Desc_template.json) are stored as
+    compact JSON text with ``is_json`` set.
+
+Every encoding can be compressed by appending ``.gz`` (gzip, level 9) or
+``.br`` (brotli, quality 11; needs the optional ``brotli`` package), e.g.
+``json-min.gz`` or ``strtab.br``.
+"""
+import gzip
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .output import dump_compact, dump_mapping
+
+MAGIC = b'ARDT'
+VERSION = 1
+
+
+def write_uvarint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_uvarints(data: bytes, pos: int, count: int):
+    """Read ``count`` unsigned LEB128 integers from ``pos``; return ``(values, end)``."""
+    values = []
+    append = values.append
+    for _ in range(count):
+        value = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        append(value)
+    return values, pos
+
+
+def encode_strtab(mapping: dict) -> bytes:
+    index = {}
+    pairs = []
+    for key, value in mapping.items():
+        pairs.append(index.setdefault(key, len(index)))
+        if isinstance(value, str):
+            pairs.append(index.setdefault(value, len(index)) << 1)
+        else:
+            text = dump_compact(value).decode('utf-8')
+            pairs.append(index.setdefault(text, len(index)) << 1 | 1)
+    encoded = [string.encode('utf-8') for string in index]
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    write_uvarint(out, len(encoded))
+    for raw in encoded:
+        write_uvarint(out, len(raw))
+    for raw in encoded:
+        out += raw
+    write_uvarint(out, len(pairs) // 2)
+    for i in pairs:
+        write_uvarint(out, i)
+    return bytes(out)
+
+
+def decode_strtab(data: bytes) -> dict:
+    if data[:4] != MAGIC or data[4] != VERSION:
+        raise ValueError('not a version 1 string table')
+    (count,), pos = read_uvarints(data, 5, 1)
+    lengths, pos = read_uvarints(data, pos, count)
+    strings = []
+    for length in lengths:
+        strings.append(data[pos:pos + length].decode('utf-8'))
+        pos += length
+    (entries,), pos = read_uvarints(data, pos, 1)
+    pairs, _ = read_uvarints(data, pos, entries * 2)
+    return {strings[k]: json.loads(strings[v >> 1]) if v & 1 else strings[v >> 1]
+            for k, v in zip(pairs[0::2], pairs[1::2])}
+
+
+def decode_json(data: bytes) -> dict:
+    return json.loads(data.decode('utf-8-sig'))
+
+
+# name -> (file suffix, encode, decode)
+BASE = {
+    'json': ('.json', dump_mapping, decode_json),
+    'json-min': ('.min.json', dump_compact, decode_json),
+    'strtab': ('.strtab', encode_strtab, decode_strtab),
+}
+
+
+COMPRESSION = {
+    'gz': (lambda data: gzip.compress(data, 9, mtime=0), gzip.decompress),
+    'br': (lambda data: brotli.compress(data, quality=11), lambda data: brotli.decompress(data)),
+}
+
+
+def available(name: str) -> bool:
+    return not name.endswith('.br') or brotli is not None
+
+
+def names() -> list:
+    """Every encoding name, including the ones whose optional package is missing."""
+    return list(BASE) + [f'{base}.{ext}' for base in BASE for ext in COMPRESSION]
+
+
+def codec(name: str):
+    """Return ``(file suffix, encode, decode)`` for the encoding ``name``."""
+    base, _, compression = name.partition('.')
+    if base not in BASE or (compression and compression not in COMPRESSION):
+        raise ValueError(f'unknown encoding {name!r}; choose from {", ".join(names())}')
+    if not available(name):
+        raise ValueError(f'encoding {name!r} needs the brotli package (pip install brotli)')
+    suffix, encode, decode = BASE[base]
+    if not compression:
+        return suffix, encode, decode
+    compress, decompress = COMPRESSION[compression]
+    return (f'{suffix}.{compression}',
+            lambda mapping: compress(encode(mapping)),
+            lambda data: decode(decompress(data)))
+
+
+def encoded_name(filename: str, name: str) -> str:
+    """``skill_name_mapping.json`` in encoding ``name`` (``skill_name_mapping.strtab.gz``...)."""
+    stem = filename[:-len('.json')] if filename.endswith('.json') else filename
+    return stem + codec(name)[0]
@@ -0,0 +1,222 @@
+"""Fuzzy-lookup index over the keys of a locale bundle.
+
+    python -m aronadict.fuzzy build [--locale jpn zh_tw] [--dist DIR]
+    python -m aronadict.fuzzy query LOCALE TEXT... [--threshold 0.95]
+
+``SpanDictionary.findFuzzy`` in content.js scores every dictionary key with a
+full Levenshtein distance for each untranslated span.  A key can only reach
+``similarity >= threshold`` (``1 - distance / max(len)``) if its length is
+within a factor ``threshold`` of the text's length and it shares enough
+character q-grams with the text: with ``d`` edits, at least
+``max(n, m) - q + 1 - q * d`` of them survive (the q-gram count filter).
+:class:`FuzzyIndex` keeps the keys grouped by length with a q-gram inverted
+index over them, and scores only the keys that pass both filters.
+
+:meth:`FuzzyIndex.find` returns what ``findFuzzy`` returns: among the keys
+scoring at least ``min(threshold, stop_at)``, it walks content.js
+``sortedEntries`` order, stops at the first key scoring ``stop_at`` or more
+(0.99 in ``SpanDictionary``, 0.98 in ``Dictionary.getFuzzyTranslation``),
+and applies the same length-difference skip rule.  :func:`exhaustive_find`
+is the scan itself.
+
+``dist/<locale>/fuzzy.json`` holds ``q``, the keys sorted by length, their
+``sortedEntries`` rank, and each q-gram's posting list as gaps between key
+ids.
+"""
+import argparse
+import bisect
+import collections
+import json
+import math
+import os
+
+from . import myers
+from .automaton import js_sorted_entries, load_bundle
+from .myers import EPSILON, limit_for
+from .output import dump_compact, write_if_changed
+from .sources import DIST_DIR, LOCALES, dist_dir
+
+FORMAT = 1
+Q = 2
+THRESHOLD = 0.95
+STOP_AT = 0.99
+
+
+def qgrams(text: str, q: int = Q) -> collections.Counter:
+    return collections.Counter(text[i:i + q] for i in range(len(text) - q + 1))
+
+
+def levenshtein(a: str, b: str) -> int:
+    """content.js ``levenshteinDistance``: the two-row dynamic programme."""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    """content.js ``similarity``."""
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    return 1 - levenshtein(a, b) / max(len(a), len(b))
+
+
+def skipped(key: str, text: str) -> bool:
+    """The length-difference shortcut of ``findFuzzy``."""
+    return abs(len(key) - len(text)) > len(text) * 0.3 and len(key) > 5 and len(text) > 5
+
+
+def exhaustive_find(entries: list, text: str, threshold: float = THRESHOLD, stop_at: float = STOP_AT):
+    """``findFuzzy`` over ``entries`` in sortedEntries order; return ``(key, keys scored)``."""
+    if not text:
+        return None, 0
+    best_score, best_key, scored = 0, None, 0
+    for key, _ in entries:
+        if skipped(key, text):
+            continue
+        scored += 1
+        score = similarity(text, key)
+        if score > best_score:
+            best_score, best_key = score, key
+            if score >= stop_at:
+                break
+    return (best_key if best_score >= threshold else None), scored
+
+
+class FuzzyIndex:
+    def __init__(self, keys: list, ranks: list, postings: dict, q: int = Q):
+        self.keys = keys
+        self.ranks = ranks
+        self.postings = postings
+        self.q = q
+        self.lengths = [len(key) for key in keys]
+
+    @classmethod
+    def from_mapping(cls, mapping: dict, q: int = Q) -> 'FuzzyIndex':
+        ranked = [key for key, _ in js_sorted_entries(mapping)]
+        rank_of = {key: rank for rank, key in enumerate(ranked)}
+        keys = sorted(ranked, key=lambda key: (len(key), rank_of[key]))
+        postings = collections.defaultdict(list)
+        for key_id, key in enumerate(keys):
+            for gram, count in qgrams(key, q).items():
+                postings[gram].extend([key_id] * count)
+        return cls(keys, [rank_of[key] for key in keys], dict(postings), q)
+
+    @classmethod
+    def load(cls, path: str) -> 'FuzzyIndex':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != FORMAT:
+            raise ValueError(f"unsupported fuzzy index format {data.get('format')}")
+        postings = {}
+        for gram, gaps in data['postings'].items():
+            ids, key_id = [], 0
+            for gap in gaps:
+                key_id += gap
+                ids.append(key_id)
+            postings[gram] = ids
+        return cls(data['keys'], data['ranks'], postings, data['q'])
+
+    def to_json(self) -> dict:
+        return {
+            'format': FORMAT,
+            'q': self.q,
+            'keys': self.keys,
+            'ranks': self.ranks,
+            'postings': {gram: [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+                         for gram, ids in self.postings.items()},
+        }
+
+    def id_range(self, low: int, high: int) -> range:
+        """Ids of the keys whose length is within ``[low, high]``."""
+        return range(bisect.bisect_left(self.lengths, low), bisect.bisect_right(self.lengths, high))
+
+    def candidates(self, text: str, threshold: float) -> list:
+        """Ids of every key that can reach ``threshold`` against ``text``."""
+        n = len(text)
+        ids = self.id_range(math.ceil(threshold * n - EPSILON), int(n / threshold + EPSILON))
+        if not ids:
+            return []
+        shared = collections.Counter()
+        for gram, count in qgrams(text, self.q).items():
+            posting = self.postings.get(gram)
+            if not posting:
+                continue
+            lo = bisect.bisect_left(posting, ids.start)
+            hi = bisect.bisect_left(posting, ids.stop, lo)
+            if count == 1:
+                shared.update(set(posting[lo:hi]))
+            else:
+                for key_id, occurrences in collections.Counter(posting[lo:hi]).items():
+                    shared[key_id] += min(count, occurrences)
+        result = []
+        for key_id in ids:
+            longest = max(n, self.lengths[key_id])
+            need = longest - self.q + 1 - self.q * limit_for(threshold, longest)
+            if need <= 0 or shared[key_id] >= need:
+                result.append(key_id)
+        return result
+
+    def find(self, text: str, threshold: float = THRESHOLD, stop_at: float = STOP_AT):
+        """The key ``findFuzzy`` would pick for ``text``; return ``(key, keys scored)``."""
+        if not text:
+            return None, 0
+        floor = min(threshold, stop_at)
+        pattern = myers.Pattern(text)
+        matches = []
+        scored = 0
+        for key_id in self.candidates(text, floor):
+            key = self.keys[key_id]
+            if skipped(key, text):
+                continue
+            scored += 1
+            score = myers.similarity(pattern, key, floor)
+            if score is not None:
+                matches.append((self.ranks[key_id], score, key))
+        best_score, best_key = 0, None
+        for _, score, key in sorted(matches):
+            if score > best_score:
+                best_score, best_key = score, key
+                if score >= stop_at:
+                    break
+        return (best_key if best_score >= threshold else None), scored
+
+
+def write_index(locale: str, dist_root: str = DIST_DIR) -> FuzzyIndex:
+    """Index the keys of ``dist/<locale>/bundle.json`` into ``fuzzy.json``."""
+    index = FuzzyIndex.from_mapping(load_bundle(locale, dist_root))
+    write_if_changed(os.path.join(dist_dir(locale, dist_root), 'fuzzy.json'), dump_compact(index.to_json()))
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build')
+    build.add_argument('--locale', nargs='+', choices=sorted(LOCALES), default=list(LOCALES))
+    build.add_argument('--dist', default=DIST_DIR)
+    query = sub.add_parser('query')
+    query.add_argument('locale', choices=sorted(LOCALES))
+    query.add_argument('text', nargs='+')
+    query.add_argument('--threshold', type=float, default=THRESHOLD)
+    query.add_argument('--dist', default=DIST_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        for locale in args.locale:
+            index = write_index(locale, args.dist)
+            print(f'{locale}: {len(index.keys)} keys, {len(index.postings)} {index.q}-grams')
+        return
+    folder = dist_dir(args.locale, args.dist)
+    index = FuzzyIndex.load(os.path.join(folder, 'fuzzy.json'))
+    bundle = load_bundle(args.locale, args.dist)
+    for text in args.text:
+        key, scored = index.find(text, args.threshold)
+        print(f'{text!r} -> {key!r} ({scored} scored): {bundle.get(key) if key is not None else None!r}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""Which dictionary entries match on real pages, and which never do.
+
+    python -m aronadict.hitrate profile LOCALE CORPUS [CORPUS ...] [--src ROOT] [--dist DIR]
+                                        [--min-hits 1] [--top 20]
+    python -m aronadict.hitrate check LOCALE CORPUS [CORPUS ...] [--dist DIR]
+
+A corpus is text captured from arona.ai pages, one text node per line:
+a JSON string, an object with a ``"text"`` field (other fields are ignored),
+or any other line taken as it is.  In the page's devtools console::
+
+    const w = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT), out = [];
+    while (w.nextNode()) if (w.currentNode.nodeValue.trim()) out.push(JSON.stringify(w.currentNode.nodeValue));
+    copy(out.join('\\n'));
+
+Each text goes through ``dist/<locale>/bundle.json`` with the semantics of
+``translateText`` (see :func:`aronadict.automaton.reference_translate`):
+every entry in ``sortedEntries`` order, each replacing all its
+case-insensitive occurrences in the text the previous entries left.
+:class:`ChainMatcher` gives the same result while only visiting the entries
+whose key is actually in the text, and counts the occurrences each entry
+replaced.  Hangul that is still there afterwards is reported as
+untranslated spans.
+
+``profile`` writes ``dist/<locale>/``:
+
+``tiers.json``
+    The corpus size, hit counts of every entry that matched, per-file
+    totals for the files of :data:`bundle.LOAD_ORDER` (the file whose value
+    won the merge), and the most frequent untranslated spans.
+``hot.json``, ``cold.json``
+    The bundle split in two: entries with at least ``--min-hits`` hits, and
+    the rest, each in bundle order; together they hold exactly the
+    bundle's entries.  With the default ``--min-hits 1``, cold entries
+    never matched in the corpus, so ``hot.json`` alone already translates
+    every text of the corpus as the whole bundle does, and ``cold.json`` can
+    be loaded later.
+
+``check`` compares :class:`ChainMatcher` with ``reference_translate`` on
+every text of the corpus.
+"""
+import argparse
+import collections
+import json
+import os
+import re
+
+from .automaton import expand_replacement, fold, js_sorted_entries, load_bundle, reference_translate
+from .bundle import LOAD_ORDER, locale_files
+from .fetch import REPO_ROOT
+from .output import dump_compact, write_if_changed
+from .sources import DIST_DIR, LOCALES, dist_dir
+
+FORMAT = 1
+MIN_HITS = 1
+
+# Runs of Hangul (syllables and jamo), joined across the spaces, digits and
+# punctuation that sit between words of one phrase.
+HANGUL_SPAN = re.compile(r'[ᄀ-ᇿ㄰-㆏가-힣]+'
+                         r'(?:[\s\d.,%+~·:/()\-]+[ᄀ-ᇿ㄰-㆏가-힣]+)*')
+
+
+def read_corpus(paths) -> list:
+    """Every text node of the corpus files ``paths``, in order."""
+    texts = []
+    for path in paths:
+        with open(path, encoding='utf-8-sig') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    item = line
+                if isinstance(item, dict):
+                    item = item.get('text')
+                if isinstance(item, str) and item:
+                    texts.append(item)
+    return texts
+
+
+class ChainMatcher:
+    """``translateText`` over ``entries`` that also counts each entry's replacements.
+
+    A trie of the folded keys finds which keys occur in the text; the entry
+    applied next is the first of those, in ``entries`` order, after the one
+    applied last.  That is the next regex of the chain that would change
+    anything, so the result is :func:`reference_translate`'s.
+    """
+
+    def __init__(self, entries: list):
+        self.entries = entries
+        self.trie = {}
+        for index, (key, _) in enumerate(entries):
+            if not key:
+                continue
+            node = self.trie
+            for ch in fold(key):
+                node = node.setdefault(ch, {})
+            # '' never labels an edge, so it can hold the entries ending here.
+            node.setdefault('', []).append(index)
+        self.hits = [0] * len(entries)
+
+    def present(self, folded: str) -> set:
+        """Indices of the entries whose key occurs in ``folded``."""
+        found = set()
+        trie = self.trie
+        n = len(folded)
+        for i in range(n):
+            node = trie.get(folded[i])
+            j = i + 1
+            while node is not None:
+                ends = node.get('')
+                if ends:
+                    found.update(ends)
+                if j == n:
+                    break
+                node = node.get(folded[j])
+                j += 1
+        return found
+
+    def translate(self, text: str) -> str:
+        result = text
+        folded = fold(result)
+        present = self.present(folded)
+        last = -1
+        while True:
+            index = min((i for i in present if i > last), default=None)
+            if index is None:
+                return result
+            key, replacement = self.entries[index]
+            needle = fold(key)
+            pieces = []
+            start = 0
+            count = 0
+            pos = folded.find(needle)
+            while pos >= 0:
+                end = pos + len(needle)
+                pieces.append(result[start:pos])
+                pieces.append(expand_replacement(replacement, result, pos, end))
+                start = end
+                count += 1
+                pos = folded.find(needle, end)
+            pieces.append(result[start:])
+            self.hits[index] += count
+            last = index
+            new = ''.join(pieces)
+            if new != result:
+                result = new
+                folded = fold(result)
+                present = self.present(folded)
+
+
+def file_of_keys(locale: str, src_root: str) -> dict:
+    """``{key: file}``: the file of :data:`bundle.LOAD_ORDER` whose value the bundle kept."""
+    files, _ = locale_files(locale, src_root)
+    owner = {}
+    for name, mapping in files:
+        for key in mapping:
+            owner[key] = name
+    return owner
+
+
+def profile(locale: str, texts: list, src_root: str = REPO_ROOT, dist_root: str = DIST_DIR,
+            min_hits: int = MIN_HITS, top: int = 20) -> dict:
+    """Run ``texts`` through the locale bundle; write and return ``tiers.json``."""
+    bundle = load_bundle(locale, dist_root)
+    matcher = ChainMatcher(js_sorted_entries(bundle))
+    untranslated = collections.Counter()
+    translated_texts = 0
+    for text in texts:
+        result = matcher.translate(text)
+        translated_texts += result != text
+        untranslated.update(m.group() for m in HANGUL_SPAN.finditer(result))
+
+    hits = {key: count for (key, _), count in zip(matcher.entries, matcher.hits) if count}
+    hot = {key: value for key, value in bundle.items() if hits.get(key, 0) >= min_hits}
+    cold = {key: value for key, value in bundle.items() if key not in hot}
+
+    owner = file_of_keys(locale, src_root)
+    files = {}
+    for key in bundle:
+        stats = files.setdefault(owner.get(key, '?'), {'entries': 0, 'hit_entries': 0, 'hits': 0})
+        stats['entries'] += 1
+        if key in hits:
+            stats['hit_entries'] += 1
+            stats['hits'] += hits[key]
+    order = {name: i for i, name in enumerate(LOAD_ORDER)}
+    files = dict(sorted(files.items(), key=lambda item: order.get(item[0], len(order))))
+
+    tiers = {
+        'format': FORMAT,
+        'corpus': {'texts': len(texts), 'chars': sum(map(len, texts)), 'translated_texts': translated_texts},
+        'entries': len(bundle),
+        'min_hits': min_hits,
+        'hot': {'file': 'hot.json', 'entries': len(hot)},
+        'cold': {'file': 'cold.json', 'entries': len(cold)},
+        'files': files,
+        'hits': dict(sorted(hits.items(), key=lambda item: -item[1])),
+        'untranslated': {'spans': len(untranslated), 'occurrences': sum(untranslated.values()),
+                         'top': untranslated.most_common(top)},
+    }
+    out = dist_dir(locale, dist_root)
+    write_if_changed(os.path.join(out, 'hot.json'), dump_compact(hot))
+    write_if_changed(os.path.join(out, 'cold.json'), dump_compact(cold))
+    write_if_changed(os.path.join(out, 'tiers.json'), dump_compact(tiers))
+    return tiers
+
+
+def check(locale: str, texts: list, dist_root: str = DIST_DIR) -> collections.Counter:
+    """Translate every text with :class:`ChainMatcher` and the regex chain; print the first differences."""
+    entries = js_sorted_entries(load_bundle(locale, dist_root))
+    matcher = ChainMatcher(entries)
+    counts = collections.Counter()
+    for text in texts:
+        expected = reference_translate(entries, text)
+        actual = matcher.translate(text)
+        counts['same' if expected == actual else 'different'] += 1
+        if expected != actual and counts['different'] <= 5:
+            print(f'{text!r}\n  regex chain: {expected!r}\n  matcher:     {actual!r}')
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('profile', help='count hits and write tiers.json, hot.json and cold.json')
+    run.add_argument('locale', choices=sorted(LOCALES))
+    run.add_argument('corpus', nargs='+')
+    run.add_argument('--src', default=REPO_ROOT, help='folder holding JPN-json/ and zh_TW-json/')
+    run.add_argument('--dist', default=DIST_DIR)
+    run.add_argument('--min-hits', type=int, default=MIN_HITS, help='hits an entry needs to be hot')
+    run.add_argument('--top', type=int, default=20, help='untranslated spans to keep and print')
+    compare = sub.add_parser('check', help='compare the matcher with the regex chain on the corpus')
+    compare.add_argument('locale', choices=sorted(LOCALES))
+    compare.add_argument('corpus', nargs='+')
+    compare.add_argument('--dist', default=DIST_DIR)
+    args = parser.parse_args(argv)
+
+    texts = read_corpus(args.corpus)
+    if args.command == 'check':
+        counts = check(args.locale, texts, args.dist)
+        print(f"{counts['same']} of {len(texts)} texts translate identically")
+        return
+
+    tiers = profile(args.locale, texts, args.src, args.dist, args.min_hits, args.top)
+    corpus = tiers['corpus']
+    print(f"{corpus['texts']} texts ({corpus['chars']} characters), {corpus['translated_texts']} changed")
+    print(f"{tiers['hot']['entries']} hot and {tiers['cold']['entries']} cold of {tiers['entries']} entries "
+          f"(hot: at least {tiers['min_hits']} hit{'s' if tiers['min_hits'] != 1 else ''})")
+    print(f'{"file":32} {"entries":>8} {"hit":>8} {"cold":>8} {"hits":>8}')
+    for name, stats in tiers['files'].items():
+        print(f"{name:32} {stats['entries']:8} {stats['hit_entries']:8} "
+              f"{stats['entries'] - stats['hit_entries']:8} {stats['hits']:8}")
+    untranslated = tiers['untranslated']
+    print(f"{untranslated['spans']} distinct untranslated Hangul spans, {untranslated['occurrences']} in all")
+    for span, count in untranslated['top']:
+        print(f'{count:8}  {span}')
+
+
+if __name__ == '__main__':
+    main()
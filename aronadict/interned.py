@@ -0,0 +1,121 @@
+"""Locale dictionaries with every distinct string stored once.
+
+    python -m aronadict.interned build [--locale jpn zh_tw] [--src ROOT] [--dist DIR]
+    python -m aronadict.interned stats LOCALE [--src ROOT] [--dist DIR]
+
+The same names and descriptions appear in many files (a student's name in
+students_mapping.json, CharacterSSRNew.json, dictionary.json...), and
+``json.load`` makes a separate string object for every occurrence.
+``dist/<locale>/interned.json`` keeps one shared string table and stores each
+file of :data:`bundle.LOAD_ORDER` as a flat list of ``key, value`` indices::
+
+    {"format": 1,
+     "strings": [...],                     # most referenced first
+     "files": {"dictionary.json": [k, v, k, v, ...], ...}}
+
+:class:`InternedBundle` rebuilds each file's mapping with shared string
+objects, and :meth:`InternedBundle.merged` yields exactly ``bundle.json``.
+"""
+import argparse
+import collections
+import gc
+import json
+import os
+import tracemalloc
+
+from .bundle import locale_files, merge
+from .fetch import REPO_ROOT
+from .output import dump_compact, write_if_changed
+from .sources import DIST_DIR, LOCALES, dist_dir
+
+FORMAT = 1
+
+
+def intern_files(files) -> dict:
+    """Serialise ``[(name, mapping)]`` with a shared string table."""
+    counts = collections.Counter()
+    for _, mapping in files:
+        counts.update(mapping.keys())
+        counts.update(mapping.values())
+    strings = [string for string, _ in counts.most_common()]
+    index = {string: i for i, string in enumerate(strings)}
+    return {
+        'format': FORMAT,
+        'strings': strings,
+        'files': {name: [index[s] for pair in mapping.items() for s in pair] for name, mapping in files},
+    }
+
+
+class InternedBundle:
+    def __init__(self, data: dict):
+        if data.get('format') != FORMAT:
+            raise ValueError(f"unsupported interned bundle format {data.get('format')}")
+        self.strings = data['strings']
+        self.refs = data['files']
+
+    @classmethod
+    def load(cls, path: str) -> 'InternedBundle':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def mapping(self, name: str) -> dict:
+        strings, refs = self.strings, self.refs[name]
+        return {strings[k]: strings[v] for k, v in zip(refs[0::2], refs[1::2])}
+
+    def files(self) -> list:
+        return [(name, self.mapping(name)) for name in self.refs]
+
+    def merged(self, drop_empty: bool = False) -> dict:
+        return merge(self.files(), drop_empty)[0]
+
+
+def write_interned(locale: str, src_root: str = REPO_ROOT, dist_root: str = DIST_DIR) -> dict:
+    files, _ = locale_files(locale, src_root)
+    data = intern_files(files)
+    write_if_changed(os.path.join(dist_dir(locale, dist_root), 'interned.json'), dump_compact(data))
+    return data
+
+
+def measure(load) -> tuple:
+    """Run ``load``; return ``(result, bytes still allocated, peak bytes)``."""
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build')
+    build.add_argument('--locale', nargs='+', choices=sorted(LOCALES), default=list(LOCALES))
+    stats = sub.add_parser('stats', help='compare memory of the merged dictionary with and without interning')
+    stats.add_argument('locale', choices=sorted(LOCALES))
+    for command in (build, stats):
+        command.add_argument('--src', default=REPO_ROOT, help='folder holding JPN-json/ and zh_TW-json/')
+        command.add_argument('--dist', default=DIST_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        for locale in args.locale:
+            data = write_interned(locale, args.src, args.dist)
+            total = sum(len(refs) for refs in data['files'].values())
+            print(f"{locale}: {len(data['strings'])} distinct strings for {total} references")
+        return
+
+    path = os.path.join(dist_dir(args.locale, args.dist), 'interned.json')
+    plain, plain_now, plain_peak = measure(lambda: merge(locale_files(args.locale, args.src)[0])[0])
+    interned, interned_now, interned_peak = measure(lambda: InternedBundle.load(path).merged())
+    if plain != interned or list(plain) != list(interned):
+        raise SystemExit('interned bundle does not merge to the same dictionary')
+    bundle = InternedBundle.load(path)
+    references = sum(len(refs) for refs in bundle.refs.values())
+    print(f'{len(plain)} merged entries; {len(bundle.strings)} distinct strings for {references} references')
+    print(f'25 JSON files: {plain_now / 2**20:7.1f} MiB retained, {plain_peak / 2**20:7.1f} MiB peak')
+    print(f'interned.json: {interned_now / 2**20:7.1f} MiB retained, {interned_peak / 2**20:7.1f} MiB peak')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Row-by-row reader for the ba-data Excel tables.
+
+``LocalizeSkillExcelTable.json`` and friends are a single object holding one
+large ``DataList`` array.  :func:`iter_rows` walks that array one element at
+a time from an open text file, decoding each row on its own and keeping only
+the requested fields, so memory use stays flat however large the table is.
+"""
+import json
+import re
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_ws = re.compile(r'[\s,]*')
+
+
+def iter_rows(fp, fields, key: str = 'DataList', chunk_size: int = CHUNK_SIZE):
+    """Yield ``{field: value}`` for every object of the ``"key": [...]`` array in ``fp``.
+
+    Fields missing from a row are left out, so callers keep using
+    ``row.get(field, default)`` as they would on the full row.
+    """
+    fields = tuple(fields)
+    start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+
+    buf = ''
+    while True:
+        chunk = fp.read(chunk_size)
+        buf += chunk
+        match = start.search(buf)
+        if match:
+            break
+        if not chunk:
+            return
+        # Keep enough of the tail to match a key split across two reads.
+        buf = buf[-(len(key) + 64):]
+
+    pos = match.end()
+    eof = False
+    want = chunk_size
+    while True:
+        pos = _ws.match(buf, pos).end()
+        if pos == len(buf):
+            if eof:
+                raise ValueError(f'unterminated "{key}" array')
+            buf = fp.read(chunk_size)
+            pos = 0
+            eof = not buf
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            row, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The row straddles the end of the buffer: read more, and more
+            # each time so an oversized row does not cost quadratic retries.
+            more = fp.read(want)
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            want *= 2
+            continue
+        want = chunk_size
+        pos = end
+        yield {f: row[f] for f in fields if f in row}
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
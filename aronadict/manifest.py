@@ -0,0 +1,96 @@
+"""Build manifest for incremental rebuilds.
+
+``.build/build-manifest.json`` records, for every generated file, the hash
+of each upstream input it was built from, a fingerprint of the extractor
+that produced it (which covers the source of the whole package), and the
+hash of the bytes written.  A later build skips an extractor whose inputs,
+fingerprint and output file all still match.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+
+from .fetch import BUILD_DIR, REPO_ROOT, write_json_atomic
+from .output import file_sha256
+
+MANIFEST_PATH = os.path.join(BUILD_DIR, 'build-manifest.json')
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Keyword arguments that change how an extractor runs, not what it returns.
+RUNTIME_KWARGS = {'workers'}
+
+
+@functools.lru_cache(maxsize=None)
+def package_hash() -> str:
+    """Hash of the source of every module of the package.
+
+    Extractors call helpers all over the package (``extractors``,
+    ``jsonstream``, ``table``...), so any edit to it makes every output stale.
+    """
+    digest = hashlib.sha256()
+    for folder, dirs, names in os.walk(PACKAGE_DIR):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(names):
+            if name.endswith('.py'):
+                path = os.path.join(folder, name)
+                digest.update(os.path.relpath(path, PACKAGE_DIR).replace(os.sep, '/').encode('utf-8') + b'\0')
+                with open(path, 'rb') as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def module_hash(module: str) -> str:
+    source = inspect.getsource(sys.modules[module])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def fingerprint(func, kwargs: dict) -> str:
+    """Identify ``func`` with ``kwargs``; changes whenever any module of the package is edited."""
+    module = func.__module__
+    code = package_hash()
+    if not module.startswith(__package__ + '.'):
+        code += module_hash(module)
+    kwargs = sorted(item for item in kwargs.items() if item[0] not in RUNTIME_KWARGS)
+    ident = f'{module}.{func.__qualname__}({kwargs!r}):{code}'
+    return hashlib.sha256(ident.encode('utf-8')).hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.outputs = json.load(f)['outputs']
+        except (FileNotFoundError, ValueError, KeyError):
+            self.outputs = {}
+
+    @staticmethod
+    def key(path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), REPO_ROOT).replace(os.sep, '/')
+
+    def is_current(self, path: str, inputs: dict, extractor: str) -> bool:
+        entry = self.outputs.get(self.key(path))
+        return (entry is not None
+                and entry['inputs'] == inputs
+                and entry['extractor'] == extractor
+                and file_sha256(path) == entry['sha256'])
+
+    def record(self, path: str, inputs: dict, extractor: str, digest: str, entries: int) -> None:
+        self.outputs[self.key(path)] = {
+            'inputs': inputs,
+            'extractor': extractor,
+            'sha256': digest,
+            'entries': entries,
+        }
+
+    def entries(self, path: str):
+        entry = self.outputs.get(self.key(path))
+        return entry and entry['entries']
+
+    def save(self) -> None:
+        write_json_atomic(self.path, {'outputs': self.outputs})
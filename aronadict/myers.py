@@ -0,0 +1,82 @@
+"""Bit-parallel edit distance (Myers 1999, in Hyyrö's global form).
+
+One query is compared against many candidate keys.  The query's
+character masks are built once (:class:`Pattern`); each candidate then costs
+one pass over its characters with a handful of big-integer operations, instead
+of the ``len(query) * len(key)`` cell updates of the dynamic programme in
+content.js.  Python integers act as bit vectors of any width, so long skill
+descriptions need no blocking.
+
+With a threshold, a candidate is dropped as soon as it cannot reach it: after
+``j`` of ``n`` characters the distance can still fall by at most ``n - j``.
+"""
+EPSILON = 1e-9
+
+
+class Pattern:
+    def __init__(self, query: str):
+        self.query = query
+        self.length = len(query)
+        self.mask = (1 << self.length) - 1
+        self.high = 1 << (self.length - 1) if query else 0
+        peq = {}
+        for i, ch in enumerate(query):
+            peq[ch] = peq.get(ch, 0) | (1 << i)
+        self.peq = peq
+
+    def distance(self, text: str, limit: int = None) -> int:
+        """Levenshtein distance to ``text``; ``None`` once it is certain to exceed ``limit``."""
+        m, n = self.length, len(text)
+        if not m:
+            return n if limit is None or n <= limit else None
+        if limit is not None and abs(m - n) > limit:
+            return None
+        peq, mask, high = self.peq, self.mask, self.high
+        pv, mv, score = mask, 0, m
+        for j, ch in enumerate(text, 1):
+            eq = peq.get(ch, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | ~(xh | pv)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+            ph = ((ph << 1) | 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | ~(xv | ph) & mask
+            mv = ph & xv
+            if limit is not None and score - (n - j) > limit:
+                return None
+        return score if limit is None or score <= limit else None
+
+
+def limit_for(threshold: float, longest: int) -> int:
+    """The most edits that still give ``1 - edits / longest >= threshold``."""
+    return int((1 - threshold) * longest + EPSILON)
+
+
+def similarity(pattern: Pattern, key: str, threshold: float = None):
+    """content.js ``similarity`` of the pattern's query and ``key``.
+
+    With ``threshold``, ``None`` is returned as soon as the score is known to
+    fall below it.
+    """
+    query = pattern.query
+    if not query or not key:
+        score = 1.0 if query == key else 0.0
+        return score if threshold is None or score >= threshold else None
+    longest = max(len(query), len(key))
+    limit = None if threshold is None else limit_for(threshold, longest)
+    distance = pattern.distance(key, limit)
+    if distance is None:
+        return None
+    score = 1 - distance / longest
+    return score if threshold is None or score >= threshold else None
+
+
+def score_batch(query: str, keys, threshold: float = None) -> list:
+    """Similarity of ``query`` to each of ``keys``; ``None`` for keys below ``threshold``."""
+    pattern = Pattern(query)
+    return [similarity(pattern, key, threshold) for key in keys]
@@ -0,0 +1,48 @@
+"""Serialising and writing dictionary files."""
+import hashlib
+import json
+import os
+import tempfile
+
+
+def dump_mapping(mapping: dict) -> bytes:
+    """Serialise ``mapping`` exactly as the scripts' ``json.dump(..., indent=4)`` does."""
+    return json.dumps(mapping, ensure_ascii=False, indent=4).encode('utf-8')
+
+
+def dump_compact(data) -> bytes:
+    """Serialise ``data`` without whitespace, for files only the extension reads."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def file_sha256(path: str):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    """Write ``data`` to ``path`` unless the file already holds exactly these bytes.
+
+    Returns whether the file was written; an untouched file keeps its mtime.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    # mkstemp creates 0600; the dictionaries are shipped and served, keep them readable.
+    os.chmod(tmp, mode)
+    os.replace(tmp, path)
+    return True
@@ -0,0 +1,220 @@
+"""Split a locale bundle into per-entity shards that can be loaded lazily.
+
+    python -m aronadict.shards page LOCALE FILE [--dist DIR]
+
+``python -m aronadict.build --bundle`` writes ``dist/<locale>/shards/``:
+
+``students/<id>.json``
+    Everything about one student: name, family name, hobby, SSR line,
+    profile, weapon, skill names, their descriptions (per level and merged
+    into one row) and the status message.
+``items/<category>.json``, ``furniture/<category>.json``, ``equipment/<category>.json``
+    Names and descriptions of one category.
+``stages/<category>.json``, ``events/<event id>.json``
+    Stage names of one stage category or of one event.
+``common.json``
+    Every bundle entry no shard claims (dictionary.json, localization
+    sections, crafting...).
+``index.json``
+    ``{"format": 1, "common": {...}, "shards": {id: {"file", "entries"}},
+    "names": {Korean name: [shard id, ...]}}``.  A page needs ``common.json``
+    plus the shards of every name it contains.
+
+Every shard is a subset of ``bundle.json`` with the bundle's values and in
+the bundle's order, so file precedence is decided once, by the merge.  An
+entry referenced by several entities is in each of their shards.
+"""
+import argparse
+import collections
+import json
+import os
+import re
+
+from .automaton import load_bundle
+from .extractors import clean_text, ex_skill_names, group_levels, skill_levels
+from .output import dump_compact, write_if_changed
+from .sources import DIST_DIR, LOCALES, SOURCE_LANG, dist_dir, profile_table_url, skill_table_url
+from .table import expand, lookup, parse_path
+
+FORMAT = 1
+
+# ``group`` is the field whose value names the shard; ``None`` makes one shard per record.
+Entity = collections.namedtuple('Entity', 'kind dataset root group fields')
+
+ENTITIES = [
+    Entity('students', 'students', (), None,
+           ('Name', 'FamilyName', 'Hobby', 'CharacterSSRNew', 'ProfileIntroduction', 'Weapon.Name', 'Skills.*.Name')),
+    Entity('items', 'items', (), 'Category', ('Name', 'Desc')),
+    Entity('furniture', 'furniture', (), 'Category', ('Name', 'Desc')),
+    Entity('equipment', 'equipment', (), 'Category', ('Name', 'Desc')),
+    Entity('stages', 'stages', (), 'Category', ('Name',)),
+    Entity('events', 'events', ('Stages',), 'EventId', ('Name',)),
+]
+
+
+def shard_id(kind: str, group) -> str:
+    return f"{kind}/{re.sub(r'[^0-9A-Za-z_.-]', '_', str(group))}"
+
+
+def entity_keys(entity: Entity, table) -> tuple:
+    """Return ``{shard id: [Korean strings]}`` and ``{Korean name: shard id}`` for ``entity``."""
+    keys = collections.defaultdict(list)
+    names = {}
+    paths = [parse_path(field) for field in entity.fields]
+    for record_id in table.order.get(SOURCE_LANG, []):
+        record = table.records[record_id].get(SOURCE_LANG)
+        if not record:
+            continue
+        group = record_id if entity.group is None else lookup(record, parse_path(entity.group))
+        if group in ({}, None, ''):
+            continue
+        shard = shard_id(entity.kind, group)
+        for path in paths:
+            keys[shard] += [value for _, value in expand(record, path) if isinstance(value, str) and value]
+        if isinstance(record.get('Name'), str) and record['Name']:
+            names.setdefault(record['Name'], set()).add(shard)
+    return keys, names
+
+
+def skill_keys(rows, ex_names: set, suffix: str) -> dict:
+    """``{Korean skill name: [description keys]}`` as skill_Desc_mapping and skill_Desc_one_row key them."""
+    rows = list(rows)
+    keys = collections.defaultdict(list)
+    for row in rows:
+        if row.get('NameKr') and row.get('DescriptionKr') and row.get('Description' + suffix):
+            keys[row['NameKr']].append(clean_text(row['DescriptionKr']))
+    levels = collections.defaultdict(list)
+    for entry in skill_levels(rows, ex_names, suffix):
+        levels[entry[0]].append(entry)
+    for skill, entries in levels.items():
+        if skill:
+            keys[skill] += list(group_levels(entries))
+    return keys
+
+
+def student_extras(sources, locale: str, students) -> dict:
+    """Skill descriptions and status messages of each student shard."""
+    loc = LOCALES[locale]
+    lang, suffix = loc['lang'], loc['suffix']
+    ex_names = ex_skill_names(students.document(lang))
+    rows = sources.rows(skill_table_url(locale), ('NameKr', 'DescriptionKr', 'Description' + suffix, 'Name' + suffix))
+    by_skill = skill_keys(rows, ex_names, suffix)
+    status = collections.defaultdict(list)
+    for row in sources.rows(profile_table_url(locale), ('CharacterId', 'StatusMessageKr')):
+        if row.get('StatusMessageKr', '').strip():
+            status[str(row.get('CharacterId'))].append(row['StatusMessageKr'].strip())
+
+    extras = collections.defaultdict(list)
+    for record_id in students.order.get(SOURCE_LANG, []):
+        record = students.records[record_id].get(SOURCE_LANG) or {}
+        shard = shard_id('students', record_id)
+        for _, name in expand(record, parse_path('Skills.*.Name')):
+            extras[shard] += by_skill.get(name, [])
+        extras[shard] += status.get(str(record_id), [])
+    return extras
+
+
+def split_bundle(bundle: dict, keys: dict) -> tuple:
+    """Cut ``bundle`` into ``{shard id: mapping}`` and the unclaimed remainder."""
+    position = {key: i for i, key in enumerate(bundle)}
+    shards = {}
+    claimed = set()
+    for shard, wanted in keys.items():
+        present = sorted({key for key in wanted if key in position}, key=position.__getitem__)
+        if present:
+            shards[shard] = {key: bundle[key] for key in present}
+            claimed.update(present)
+    common = {key: value for key, value in bundle.items() if key not in claimed}
+    return shards, common
+
+
+def build_shards(locale: str, sources, dist_root: str = DIST_DIR) -> dict:
+    """Write ``dist/<locale>/shards/`` from the locale's bundle; return the index.
+
+    ``sources`` is a :class:`aronadict.build.Sources` whose tables include the
+    Korean documents and the locale's language.
+    """
+    bundle = load_bundle(locale, dist_root)
+    keys = collections.defaultdict(list)
+    names = {}
+    for entity in ENTITIES:
+        table = sources.table(entity.dataset, entity.root)
+        entity_part, entity_names = entity_keys(entity, table)
+        for shard, wanted in entity_part.items():
+            keys[shard] += wanted
+        for name, ids in entity_names.items():
+            names.setdefault(name, set()).update(ids)
+        if entity.kind == 'students':
+            for shard, wanted in student_extras(sources, locale, table).items():
+                keys[shard] += wanted
+    shards, common = split_bundle(bundle, keys)
+
+    out = os.path.join(dist_dir(locale, dist_root), 'shards')
+    index = {
+        'format': FORMAT,
+        'common': {'file': 'common.json', 'entries': len(common)},
+        'shards': {shard: {'file': f'{shard}.json', 'entries': len(mapping)} for shard, mapping in shards.items()},
+        'names': {name: sorted(ids & shards.keys()) for name, ids in names.items() if ids & shards.keys()},
+    }
+    files = {'common.json': common, **{f'{shard}.json': mapping for shard, mapping in shards.items()}}
+    for name, mapping in files.items():
+        write_if_changed(os.path.join(out, name), dump_compact(mapping))
+    write_if_changed(os.path.join(out, 'index.json'), dump_compact(index))
+    # Shards of entities that are gone upstream.
+    for folder, _, filenames in os.walk(out):
+        for filename in filenames:
+            name = os.path.relpath(os.path.join(folder, filename), out).replace(os.sep, '/')
+            if name != 'index.json' and name not in files:
+                os.remove(os.path.join(folder, filename))
+    return index
+
+
+class ShardIndex:
+    def __init__(self, folder: str):
+        self.folder = folder
+        with open(os.path.join(folder, 'index.json'), encoding='utf-8') as f:
+            self.index = json.load(f)
+        if self.index.get('format') != FORMAT:
+            raise ValueError(f"unsupported shard index format {self.index.get('format')}")
+
+    def shards_for(self, text: str) -> list:
+        """Ids of the shards whose entities are named in ``text``."""
+        found = set()
+        for name, ids in self.index['names'].items():
+            if name in text:
+                found.update(ids)
+        return sorted(found)
+
+    def load(self, shards) -> dict:
+        """``common.json`` merged with ``shards``."""
+        files = [self.index['common']['file']] + [self.index['shards'][shard]['file'] for shard in shards]
+        merged = {}
+        for name in files:
+            with open(os.path.join(self.folder, name), encoding='utf-8') as f:
+                merged.update(json.load(f))
+        return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    page = sub.add_parser('page', help='list the shards a page (a text file) needs')
+    page.add_argument('locale', choices=sorted(LOCALES))
+    page.add_argument('file')
+    page.add_argument('--dist', default=DIST_DIR)
+    args = parser.parse_args(argv)
+
+    index = ShardIndex(os.path.join(dist_dir(args.locale, args.dist), 'shards'))
+    with open(args.file, encoding='utf-8') as f:
+        text = f.read()
+    shards = index.shards_for(text)
+    loaded = index.load(shards)
+    total = index.index['common']['entries'] + sum(s['entries'] for s in index.index['shards'].values())
+    for shard in shards:
+        print(f"{shard}: {index.index['shards'][shard]['entries']} entries")
+    print(f"common + {len(shards)} of {len(index.index['shards'])} shards: {len(loaded)} entries "
+          f"(all shards: {total})")
+
+
+if __name__ == '__main__':
+    main()
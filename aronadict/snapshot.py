@@ -0,0 +1,180 @@
+"""Recorded upstream snapshots for offline, repeatable builds.
+
+A snapshot is a named set of upstream payloads::
+
+    .build/snapshots/objects/<aa>/<sha256>     bodies, shared by all snapshots
+    .build/snapshots/<name>/manifest.json      url -> sha256, size, recorded_at
+
+In *record* mode every payload the fetch layer obtains is also added to the
+snapshot; in *replay* mode the fetch layer serves bodies from the snapshot
+and never touches the network.  Scripts pick the mode up from
+``ARONA_SNAPSHOT_MODE`` (``record`` / ``replay``) and ``ARONA_SNAPSHOT``
+(the snapshot name); the builder takes ``--record NAME`` / ``--replay NAME``.
+
+    python -m aronadict.snapshot list
+    python -m aronadict.snapshot verify NAME
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from .fetch import BUILD_DIR, HttpCache, write_json_atomic
+
+SNAPSHOT_DIR = os.environ.get('ARONA_SNAPSHOT_DIR', os.path.join(BUILD_DIR, 'snapshots'))
+FORMAT = 1
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class Snapshot:
+    def __init__(self, name: str, root: str = SNAPSHOT_DIR):
+        self.name = name
+        self.root = root
+        self.manifest_path = os.path.join(root, name, 'manifest.json')
+        self._lock = threading.Lock()
+        self.manifest = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {'format': FORMAT, 'name': self.name, 'created': time.time(), 'entries': {}}
+        if manifest.get('format') != FORMAT:
+            raise SnapshotError(f'{self.manifest_path}: unsupported format {manifest.get("format")}')
+        return manifest
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    @property
+    def entries(self) -> dict:
+        return self.manifest['entries']
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def add(self, url: str, meta: dict, body_path: str) -> None:
+        """Record the body at ``body_path`` (already hashed as ``meta['sha256']``) for ``url``."""
+        target = self.object_path(meta['sha256'])
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp = target + '.part'
+            try:
+                os.link(body_path, tmp)
+            except OSError:
+                shutil.copyfile(body_path, tmp)
+            os.replace(tmp, target)
+        with self._lock:
+            self.entries[url] = {
+                'sha256': meta['sha256'],
+                'size': meta['size'],
+                'etag': meta.get('etag'),
+                'last_modified': meta.get('last_modified'),
+                'recorded_at': time.time(),
+            }
+            write_json_atomic(self.manifest_path, self.manifest)
+
+    def lookup(self, url: str) -> dict:
+        entry = self.entries.get(url)
+        if entry is None:
+            raise SnapshotError(f'{url} is not in snapshot {self.name!r}')
+        return entry
+
+    def verify(self) -> list:
+        """Return the URLs whose recorded body is missing or does not match its hash."""
+        bad = []
+        for url, entry in self.entries.items():
+            digest = hashlib.sha256()
+            try:
+                with open(self.object_path(entry['sha256']), 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(chunk)
+            except OSError:
+                bad.append(url)
+                continue
+            if digest.hexdigest() != entry['sha256']:
+                bad.append(url)
+        return bad
+
+
+class RecordingCache(HttpCache):
+    """:class:`HttpCache` that also copies every payload into a snapshot."""
+
+    def __init__(self, snapshot: Snapshot, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.snapshot = snapshot
+
+    def fetch(self, url: str) -> dict:
+        meta = super().fetch(url)
+        if self.snapshot.entries.get(url, {}).get('sha256') != meta['sha256']:
+            self.snapshot.add(url, meta, self.object_path(meta['sha256']))
+        return meta
+
+
+class ReplayCache:
+    """Drop-in for :class:`HttpCache` that serves a snapshot and never uses the network."""
+
+    def __init__(self, snapshot: Snapshot):
+        if not snapshot.exists:
+            raise SnapshotError(f'no snapshot named {snapshot.name!r} in {snapshot.root}')
+        self.snapshot = snapshot
+
+    def object_path(self, digest: str) -> str:
+        return self.snapshot.object_path(digest)
+
+    def fetch(self, url: str) -> dict:
+        entry = self.snapshot.lookup(url)
+        return dict(entry, url=url, status='replay', wire_bytes=0)
+
+    def path(self, url: str) -> str:
+        return self.object_path(self.fetch(url)['sha256'])
+
+
+def make_cache(mode: str, name: str, session=None):
+    """Return the cache for ``mode`` (``record`` or ``replay``) on snapshot ``name``."""
+    snapshot = Snapshot(name)
+    if mode == 'record':
+        return RecordingCache(snapshot, session=session)
+    if mode == 'replay':
+        return ReplayCache(snapshot)
+    raise ValueError(f'unknown snapshot mode {mode!r}')
+
+
+def list_snapshots(root: str = SNAPSHOT_DIR) -> list:
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root)
+                  if os.path.exists(os.path.join(root, name, 'manifest.json')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect recorded upstream snapshots.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list')
+    verify = sub.add_parser('verify')
+    verify.add_argument('name')
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name in list_snapshots():
+            snapshot = Snapshot(name)
+            size = sum(e['size'] for e in snapshot.entries.values())
+            created = time.strftime('%Y-%m-%d %H:%M', time.localtime(snapshot.manifest['created']))
+            print(f'{name}\t{created}\t{len(snapshot.entries)} documents\t{size} bytes')
+    else:
+        bad = Snapshot(args.name).verify()
+        for url in bad:
+            print(f'corrupt or missing: {url}')
+        raise SystemExit(1 if bad else 0)
+
+
+if __name__ == '__main__':
+    main()
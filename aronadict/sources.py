@@ -0,0 +1,52 @@
+"""Upstream documents and output locales.
+
+Base URLs can be redirected (e.g. to a local mirror) with the
+``ARONA_SCHALEDB_BASE`` and ``ARONA_BA_DATA_BASE`` environment variables.
+"""
+import os
+
+from .fetch import REPO_ROOT
+
+SCHALEDB_BASE = os.environ.get('ARONA_SCHALEDB_BASE', 'https://schaledb.com')
+BA_DATA_BASE = os.environ.get(
+    'ARONA_BA_DATA_BASE', 'https://raw.githubusercontent.com/electricgoat/ba-data/refs/heads')
+
+# content.js language setting -> schaledb language, ba-data Excel column suffix,
+# ba-data branch and the folder the extension loads dictionaries from.
+LOCALES = {
+    'jpn': {'lang': 'jp', 'suffix': 'Jp', 'branch': 'jp', 'json_dir': 'JPN-json'},
+    'zh_tw': {'lang': 'tw', 'suffix': 'Tw', 'branch': 'global', 'json_dir': 'zh_TW-json'},
+}
+
+SOURCE_LANG = 'kr'
+
+DIST_DIR = os.path.join(REPO_ROOT, 'dist')
+
+
+def schaledb_url(lang: str, name: str) -> str:
+    return f'{SCHALEDB_BASE}/data/{lang}/{name}.json'
+
+
+def crafting_url() -> str:
+    return f'{SCHALEDB_BASE}/data/crafting.json'
+
+
+def ba_data_url(branch: str, path: str) -> str:
+    return f'{BA_DATA_BASE}/{branch}/{path}'
+
+
+def skill_table_url(locale: str) -> str:
+    return ba_data_url(LOCALES[locale]['branch'], 'DB/LocalizeSkillExcelTable.json')
+
+
+def profile_table_url(locale: str) -> str:
+    return ba_data_url(LOCALES[locale]['branch'], 'Excel/LocalizeCharProfileExcelTable.json')
+
+
+def json_dir(locale: str, root: str = REPO_ROOT) -> str:
+    return os.path.join(root, LOCALES[locale]['json_dir'])
+
+
+def dist_dir(locale: str, root: str = DIST_DIR) -> str:
+    """Where artifacts derived from a locale's dictionaries (bundles, indexes...) go."""
+    return os.path.join(root, locale)
@@ -0,0 +1,78 @@
+"""Declarative description of the schaledb field mappings.
+
+Every dictionary that is just "field X of a record in Korean -> the same field
+of the record with the same id in the target language" is one :class:`Mapping`
+row below.  Adding a dictionary (or a locale, see :data:`sources.LOCALES`) is a
+table edit, not a new script: the builder projects each row out of the
+:class:`~aronadict.table.AlignedTable` of its dataset, which is loaded and
+joined once for all locales.
+
+Mapping fields:
+
+``output``
+    File name inside the locale's ``*-json`` folder.
+``dataset``
+    schaledb document name (``students``, ``items``, ``localization``...).
+``field``
+    Dotted path inside a record; ``*`` walks every key at that level
+    (``Skills.*.Name``) and ``''`` means the record itself.
+``root``
+    Path from the document to the id -> record object (``('Stages',)``).
+``order``
+    ``'source'`` or ``'target'``: whose document order the output follows.
+``keep_empty``
+    Keep ids whose value is empty on either side (the localization
+    sections always did).
+"""
+import collections
+
+from .sources import SOURCE_LANG, schaledb_url
+from .table import AlignedTable
+
+Mapping = collections.namedtuple('Mapping', 'output dataset field root order keep_empty',
+                                 defaults=((), 'source', False))
+
+# A job argument built from ``dataset`` in every language of the build; ``langs``
+# are the languages whose documents the job actually depends on.
+Table = collections.namedtuple('Table', 'dataset root langs')
+
+MAPPINGS = [
+    Mapping('CharacterSSRNew.json', 'students', 'CharacterSSRNew'),
+    Mapping('equipment_name_mapping.json', 'equipment', 'Name'),
+    Mapping('equipment_Desc_mapping.json', 'equipment', 'Desc'),
+    Mapping('furniture_name_mapping.json', 'furniture', 'Name'),
+    Mapping('furniture_Desc_mapping.json', 'furniture', 'Desc'),
+    Mapping('ArmorType.json', 'localization', '', root=('ArmorType',), keep_empty=True),
+    Mapping('BulletType.json', 'localization', '', root=('BulletType',), keep_empty=True),
+    Mapping('Club.json', 'localization', '', root=('Club',), keep_empty=True),
+    Mapping('Event.json', 'localization', '', root=('EventName',), keep_empty=True),
+    Mapping('FamilyName_mapping.json', 'students', 'FamilyName'),
+    Mapping('Hobby_mapping.json', 'students', 'Hobby'),
+    Mapping('item_name_mapping.json', 'items', 'Name'),
+    Mapping('item_Desc_mapping.json', 'items', 'Desc'),
+    Mapping('School.json', 'localization', '', root=('School',), keep_empty=True),
+    Mapping('skill_name_mapping.json', 'students', 'Skills.*.Name'),
+    Mapping('students_mapping.json', 'students', 'Name'),
+    Mapping('TacticRole.json', 'localization', '', root=('TacticRole',), keep_empty=True),
+    Mapping('stages_name_mapping.json', 'stages', 'Name'),
+    Mapping('stages_Event_mapping.json', 'events', 'Name', root=('Stages',), order='target'),
+    Mapping('ProfileIntroduction.json', 'students', 'ProfileIntroduction'),
+    Mapping('WeaponNameMapping.json', 'students', 'Weapon.Name'),
+]
+
+
+def table_urls(table: Table) -> list:
+    return [schaledb_url(lang, table.dataset) for lang in table.langs]
+
+
+def load_table(dataset: str, root: tuple, langs, get) -> AlignedTable:
+    """Join ``dataset`` across ``langs``; ``get(url)`` returns a parsed document."""
+    return AlignedTable({lang: get(schaledb_url(lang, dataset)) for lang in langs}, root)
+
+
+def mapping_job(spec: Mapping, lang: str) -> tuple:
+    """The builder job that writes ``spec`` for target language ``lang``."""
+    source = Table(spec.dataset, spec.root, (SOURCE_LANG, lang))
+    kwargs = {'field': spec.field, 'src': SOURCE_LANG, 'tgt': lang,
+              'order': spec.order, 'keep_empty': spec.keep_empty}
+    return spec.output, AlignedTable.project, [source], kwargs
@@ -0,0 +1,249 @@
+"""Local stand-in for schaledb and ba-data, served from a recorded snapshot.
+
+    python -m aronadict.standin NAME [--port 8799] [--latency MS] [--jitter MS]
+                                     [--bandwidth KBPS] [--error-rate P] [--seed N]
+
+Every document of snapshot NAME (see :mod:`aronadict.snapshot`) is served at
+its original URL path: ``/data/{jp,kr,tw}/*.json``, ``/data/crafting.json``
+and ``/electricgoat/ba-data/refs/heads/<branch>/...``.  Point the fetch layer
+at it with the two variables the server prints on start::
+
+    ARONA_SCHALEDB_BASE=http://127.0.0.1:8799
+    ARONA_BA_DATA_BASE=http://127.0.0.1:8799/electricgoat/ba-data/refs/heads
+
+Responses carry an ``ETag`` (the body's sha256, per content coding) and the
+recorded ``Last-Modified``; ``If-None-Match`` / ``If-Modified-Since`` get a
+304.  Bodies are gzip- or brotli-compressed when the client accepts it (brotli
+needs the optional ``brotli`` package).  ``--latency``/``--jitter`` delay
+every response, ``--bandwidth`` caps each response's transfer rate, and
+``--error-rate`` answers that fraction of requests with a 503 (or the
+``--error-status`` given), so retries and backoff can be exercised.  With
+``--seed`` the injected latencies and failures repeat from run to run.
+"""
+import argparse
+import email.utils
+import gzip
+import http.server
+import random
+import threading
+import time
+import urllib.parse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .snapshot import SNAPSHOT_DIR, Snapshot, SnapshotError
+
+CHUNK_SIZE = 16 * 1024
+BA_DATA_PREFIX = '/electricgoat/ba-data/refs/heads'
+
+
+def url_path(url: str) -> str:
+    """The path a snapshot URL is served at (raw.githubusercontent.com drops its host)."""
+    return urllib.parse.urlsplit(url).path
+
+
+class Conditions:
+    """Injected latency, bandwidth cap and failures, drawn from one seeded generator."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, bandwidth: float = None,
+                 error_rate: float = 0.0, error_status: int = 503, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> tuple:
+        """Return ``(delay in seconds, fail?)`` for one request."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+        return delay, fail
+
+
+class StandIn(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, snapshot: Snapshot, address=('127.0.0.1', 0), conditions: Conditions = None):
+        super().__init__(address, Handler)
+        self.snapshot = snapshot
+        self.conditions = conditions or Conditions()
+        self.routes = {url_path(url): entry for url, entry in snapshot.entries.items()}
+        self.stats = {'requests': 0, 200: 0, 304: 0, 404: 0, 'injected': 0, 'bytes': 0}
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, key, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def body(self, entry: dict, coding: str) -> bytes:
+        """The recorded body in ``coding`` (``identity``, ``gzip`` or ``br``), compressed once."""
+        key = (entry['sha256'], coding)
+        if key not in self._encoded:
+            with open(self.snapshot.object_path(entry['sha256']), 'rb') as f:
+                data = f.read()
+            if coding == 'gzip':
+                data = gzip.compress(data, 6, mtime=0)
+            elif coding == 'br':
+                data = brotli.compress(data)
+            self._encoded[key] = data
+        return self._encoded[key]
+
+    def start(self) -> threading.Thread:
+        """Serve from a daemon thread; stop with :meth:`shutdown`."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def pick_coding(accept: str) -> str:
+    offered = {}
+    for part in accept.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            offered[name.strip().lower()] = q
+    for coding in ('br', 'gzip'):
+        if offered.get(coding, 0) > 0 and (coding != 'br' or brotli is not None):
+            return coding
+    return 'identity'
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: StandIn
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def respond(self, send_body: bool) -> None:
+        server = self.server
+        server.count('requests')
+        delay, fail = server.conditions.draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            server.count('injected')
+            self.send_error(server.conditions.error_status, 'injected failure')
+            return
+        entry = server.routes.get(urllib.parse.urlsplit(self.path).path)
+        if entry is None:
+            server.count(404)
+            self.send_error(404)
+            return
+
+        coding = pick_coding(self.headers.get('Accept-Encoding', ''))
+        etag = f'"{entry["sha256"]}"' if coding == 'identity' else f'"{entry["sha256"]}-{coding}"'
+        last_modified = entry.get('last_modified') or email.utils.formatdate(entry['recorded_at'], usegmt=True)
+        if self.not_modified(etag, last_modified):
+            server.count(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+
+        data = server.body(entry, coding)
+        server.count(200)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Vary', 'Accept-Encoding')
+        if coding != 'identity':
+            self.send_header('Content-Encoding', coding)
+        self.end_headers()
+        if send_body:
+            self.send_throttled(data)
+
+    def not_modified(self, etag: str, last_modified: str) -> bool:
+        match = self.headers.get('If-None-Match')
+        if match is not None:
+            return match.strip() == '*' or etag in [tag.strip() for tag in match.split(',')]
+        since = self.headers.get('If-Modified-Since')
+        if since is None:
+            return False
+        try:
+            return email.utils.parsedate_to_datetime(last_modified) <= email.utils.parsedate_to_datetime(since)
+        except (TypeError, ValueError):
+            return False
+
+    def send_throttled(self, data: bytes) -> None:
+        bandwidth = self.server.conditions.bandwidth
+        start = time.perf_counter()
+        sent = 0
+        try:
+            for i in range(0, len(data), CHUNK_SIZE):
+                chunk = data[i:i + CHUNK_SIZE]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if bandwidth:
+                    ahead = sent / (bandwidth * 1024) - (time.perf_counter() - start)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.server.count('bytes', sent)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('name', help='snapshot to serve')
+    parser.add_argument('--root', default=SNAPSHOT_DIR, help='snapshot folder')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--latency', type=float, default=0.0, metavar='MS', help='delay before every response')
+    parser.add_argument('--jitter', type=float, default=0.0, metavar='MS', help='extra random delay, 0..MS')
+    parser.add_argument('--bandwidth', type=float, metavar='KBPS', help='cap each response at KBPS KiB/s')
+    parser.add_argument('--error-rate', type=float, default=0.0, metavar='P',
+                        help='fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, help='make injected latency and failures repeatable')
+    args = parser.parse_args(argv)
+
+    snapshot = Snapshot(args.name, args.root)
+    if not snapshot.exists:
+        raise SnapshotError(f'no snapshot named {args.name!r} in {args.root}')
+    conditions = Conditions(args.latency / 1000, args.jitter / 1000, args.bandwidth,
+                            args.error_rate, args.error_status, args.seed)
+    server = StandIn(snapshot, (args.host, args.port), conditions)
+    print(f'serving {len(server.routes)} documents of snapshot {args.name!r}')
+    print(f'ARONA_SCHALEDB_BASE={server.base}')
+    print(f'ARONA_BA_DATA_BASE={server.base}{BA_DATA_PREFIX}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = server.stats
+        print(f"{stats['requests']} requests: {stats[200]} sent, {stats[304]} not modified, "
+              f"{stats[404]} not found, {stats['injected']} injected failures, {stats['bytes']} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Id-aligned multilingual view of one schaledb dataset.
+
+schaledb publishes every dataset once per language with the same ids
+(``students.json``, ``items.json``, the sections of ``localization.json``...).
+:class:`AlignedTable` joins all requested languages by id in a single pass, and
+:meth:`AlignedTable.project` reads any field pair out of the joined rows, so
+every mapping over a dataset is a projection of one join.
+"""
+
+
+def parse_path(field: str) -> tuple:
+    """``'Skills.*.Name'`` -> ``('Skills', '*', 'Name')``; ``''`` is the record itself."""
+    return tuple(field.split('.')) if field else ()
+
+
+def expand(value, path: tuple, prefix: tuple = ()):
+    """Yield ``(concrete path, value)`` for ``path``; ``*`` walks every key at that level."""
+    if not path:
+        yield prefix, value
+        return
+    head, rest = path[0], path[1:]
+    if not isinstance(value, dict):
+        return
+    if head == '*':
+        for key in value:
+            yield from expand(value.get(key, {}), rest, prefix + (key,))
+    else:
+        yield from expand(value.get(head, {}), rest, prefix + (head,))
+
+
+def lookup(value, path: tuple):
+    for key in path:
+        value = value.get(key, {})
+    return value
+
+
+class AlignedTable:
+    """Records of one dataset in several languages, keyed by id.
+
+    ``records[id][lang]`` is the record for ``id`` in ``lang``; ``order[lang]``
+    lists the ids in the order that language's document has them.
+    """
+
+    def __init__(self, docs: dict, root: tuple = ()):
+        self.records = {}
+        self.order = {}
+        for lang, doc in docs.items():
+            for part in root:
+                doc = doc.get(part, {})
+            self.order[lang] = list(doc)
+            for record_id, record in doc.items():
+                self.records.setdefault(record_id, {})[lang] = record
+
+    def document(self, lang: str) -> dict:
+        """The id -> record object of ``lang``, as it was loaded."""
+        return {record_id: self.records[record_id][lang] for record_id in self.order[lang]}
+
+    def project(self, field: str, src: str, tgt: str, order: str = 'source', keep_empty: bool = False) -> dict:
+        """Map ``field`` in ``src`` to ``field`` in ``tgt`` for every id present in both.
+
+        ``order`` picks whose document order the result follows.  Unless
+        ``keep_empty`` is set, rows where either record or either value is
+        empty are dropped.
+        """
+        path = parse_path(field)
+        mapping = {}
+        for record_id in self.order[src if order == 'source' else tgt]:
+            row = self.records[record_id]
+            if src not in row or tgt not in row:
+                continue
+            src_record, tgt_record = row[src], row[tgt]
+            if not keep_empty and not (src_record and tgt_record):
+                continue
+            for concrete, src_value in expand(src_record, path):
+                tgt_value = lookup(tgt_record, concrete)
+                if keep_empty or (src_value and tgt_value):
+                    mapping[src_value] = tgt_value
+        return mapping
@@ -0,0 +1,156 @@
+"""Number-template dictionary for skill descriptions.
+
+skill_Desc_mapping.json stores every level of every skill as its own literal
+sentence.  This module folds the levels into one entry per masked Korean
+sentence (masked exactly like :func:`extractors.extract_numbers_and_mask`)::
+
+    "공격력을 {num} 증가": {"slots": ["percent"], "target": ["攻撃力を", 0, "増加"]}
+
+``slots`` gives the type of each Korean number (``int``, ``float`` or
+``percent``).  ``target`` is the translation as literal strings and indices
+of the Korean slot that goes there.  A target slot is tied to the Korean slot
+holding the same value in every known level, so reordered numbers stay
+correct.  Target numbers that never change are kept as literals.
+
+:class:`TemplateDictionary` translates any instance of a template, including
+levels that are not in the table, with one hash probe::
+
+    python -m aronadict.templates check dist/jpn/skill_Desc_template.json JPN-json/skill_Desc_mapping.json
+    python -m aronadict.templates translate dist/jpn/skill_Desc_template.json "공격력을 12% 증가"
+
+The builder writes the templates to ``dist/<locale>/``: content.js does not
+load them, so they stay out of the ``*-json`` folders the extension ships.
+"""
+import argparse
+import collections
+import json
+
+from .extractors import extract_numbers_and_mask, skill_descriptions
+
+
+def slot_type(number: str) -> str:
+    if number.endswith('%'):
+        return 'percent'
+    return 'float' if '.' in number else 'int'
+
+
+def slot_types(instances) -> list:
+    """The type of each Korean slot over all ``instances``, or ``None`` if percent-ness disagrees."""
+    types = []
+    for numbers in zip(*(key_nums for key_nums, _ in instances)):
+        kinds = {slot_type(number) for number in numbers}
+        if kinds == {'percent'}:
+            types.append('percent')
+        elif 'percent' in kinds:
+            return None
+        else:
+            types.append('float' if 'float' in kinds else 'int')
+    return types
+
+
+def align(masked_value: str, instances):
+    """Build the target parts for ``masked_value``, or ``None`` if a slot can't be tied down."""
+    literals = masked_value.split('{num}')
+    parts = [literals[0]]
+    used = set()
+    for j, literal in enumerate(literals[1:]):
+        candidates = None
+        for key_nums, value_nums in instances:
+            matches = {i for i, number in enumerate(key_nums) if number == value_nums[j]}
+            candidates = matches if candidates is None else candidates & matches
+        if candidates:
+            slot = min(candidates - used or candidates)
+            used.add(slot)
+            parts.append(slot)
+        elif len({value_nums[j] for _, value_nums in instances}) == 1:
+            parts.append(instances[0][1][j])
+        else:
+            return None
+        parts.append(literal)
+    # Merge adjacent literals so the target alternates text and slots.
+    merged = []
+    for part in parts:
+        if merged and isinstance(part, str) and isinstance(merged[-1], str):
+            merged[-1] += part
+        elif part != '':
+            merged.append(part)
+    return merged
+
+
+def build_templates(mapping: dict) -> dict:
+    """Fold the literal KR -> target ``mapping`` into number templates.
+
+    Entries without numbers are left to the literal dictionary.  When levels
+    of one Korean template translate to differently shaped targets, the most
+    common target shape wins.
+    """
+    groups = collections.OrderedDict()
+    for kr, tgt in mapping.items():
+        masked_key, key_nums = extract_numbers_and_mask(kr)
+        if not key_nums:
+            continue
+        masked_value, value_nums = extract_numbers_and_mask(tgt)
+        groups.setdefault(masked_key, collections.OrderedDict()).setdefault(
+            (masked_value, len(value_nums)), []).append((key_nums, value_nums))
+
+    templates = collections.OrderedDict()
+    for masked_key, targets in groups.items():
+        (masked_value, _), instances = max(targets.items(), key=lambda item: len(item[1]))
+        types = slot_types(instances)
+        target = align(masked_value, instances) if types is not None else None
+        if target is not None:
+            templates[masked_key] = {'slots': types, 'target': target}
+    return templates
+
+
+def skill_templates(rows, suffix: str, workers: int = 1) -> dict:
+    return build_templates(skill_descriptions(rows, suffix, workers))
+
+
+class TemplateDictionary:
+    def __init__(self, templates: dict):
+        self.templates = templates
+
+    @classmethod
+    def load(cls, path: str) -> 'TemplateDictionary':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def lookup(self, text: str):
+        """Translate ``text`` if it is an instance of a template, else return ``None``."""
+        masked, numbers = extract_numbers_and_mask(text)
+        template = self.templates.get(masked)
+        if template is None or len(numbers) != len(template['slots']):
+            return None
+        for number, kind in zip(numbers, template['slots']):
+            if (kind == 'percent') != number.endswith('%'):
+                return None
+        return ''.join(part if isinstance(part, str) else numbers[part] for part in template['target'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect a skill description template dictionary.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    check = sub.add_parser('check', help='count the literal entries the templates reproduce')
+    check.add_argument('templates')
+    check.add_argument('mapping')
+    translate = sub.add_parser('translate')
+    translate.add_argument('templates')
+    translate.add_argument('text', nargs='+')
+    args = parser.parse_args(argv)
+
+    dictionary = TemplateDictionary.load(args.templates)
+    if args.command == 'translate':
+        for text in args.text:
+            print(dictionary.lookup(text))
+        return
+    with open(args.mapping, encoding='utf-8') as f:
+        mapping = json.load(f)
+    covered = sum(dictionary.lookup(kr) == tgt for kr, tgt in mapping.items())
+    numeric = sum(bool(extract_numbers_and_mask(kr)[1]) for kr in mapping)
+    print(f'{len(mapping)} literal entries, {numeric} with numbers')
+    print(f'{len(dictionary.templates)} templates reproduce {covered} of them exactly')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""Per-stage spans of a build: wall and CPU time, bytes and memory.
+
+    python -m aronadict.build --trace build-trace.json [--threads 1 --processes 0]
+
+While :data:`TRACER` is started, the builder wraps each stage of every
+extractor in a :func:`span`:
+
+``fetch``      one upstream URL through the cache (bytes on the wire -> body)
+``decode``     reading a cached body and decoding it to text
+``parse``      ``json`` parsing of that text, and joining a dataset's languages
+``transform``  the extractor itself
+``write``      encoding its mapping and writing the files
+
+A span records wall time, CPU time of its thread (``time.thread_time``),
+bytes in and out (characters for decoded text), and the tracemalloc peak
+above the level at which it started.  Peaks are exact when spans do not overlap in one process, i.e.
+with ``--threads 1 --processes 0``; otherwise a span's peak may include
+allocations of the spans running beside it.  Extractors that stream a table
+row by row (see :mod:`aronadict.jsonstream`) decode and parse it while they
+transform, so :func:`stream` adds up the time spent inside the reader and
+records it as ``interleaved`` decode and parse spans nested in the
+transform span.
+
+:func:`chrome_trace` turns the spans into Chrome trace-event JSON (open it in
+``chrome://tracing`` or https://ui.perfetto.dev), and :func:`summary` prints
+per-stage totals and, given groups, one row per extractor.  Totals use each
+span's self time, without the spans nested in it.
+"""
+import collections
+import os
+import threading
+import time
+import tracemalloc
+
+from .output import dump_compact, write_if_changed
+
+Span = collections.namedtuple(
+    'Span', 'stage name start end wall cpu bytes_in bytes_out peak pid tid interleaved')
+
+STAGES = ('fetch', 'decode', 'parse', 'transform', 'write')
+
+
+class _OpenSpan:
+    def __init__(self, tracer, stage: str, name: str, bytes_in: int):
+        self.tracer = tracer
+        self.stage = stage
+        self.name = name
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+
+    def __enter__(self):
+        self.base = self.tracer._enter()
+        self.start = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        cpu = time.thread_time() - self.cpu
+        peak = self.tracer._exit(self.base)
+        self.tracer.add(Span(self.stage, self.name, self.start, end, end - self.start, cpu,
+                             self.bytes_in, self.bytes_out, peak, os.getpid(), threading.get_native_id(), False))
+        return False
+
+
+class _NullSpan:
+    bytes_in = bytes_out = 0
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+class Tracer:
+    """Collects :class:`Span` records from every thread of a process."""
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.spans = []
+        self._lock = threading.Lock()
+        self._open = 0
+
+    def start(self, memory: bool = True) -> None:
+        self.enabled = True
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.enabled = False
+
+    def span(self, stage: str, name: str, bytes_in: int = 0):
+        """Context manager recording one span; set ``.bytes_out`` on it before it closes."""
+        if not self.enabled:
+            return _NULL
+        return _OpenSpan(self, stage, name, bytes_in)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def extend(self, spans) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def drain(self) -> list:
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def _enter(self) -> int:
+        if not self.memory:
+            return 0
+        with self._lock:
+            # Only restart the peak when nothing else is measuring it.
+            if self._open == 0:
+                tracemalloc.reset_peak()
+            self._open += 1
+            return tracemalloc.get_traced_memory()[0]
+
+    def _exit(self, base: int):
+        if not self.memory:
+            return None
+        with self._lock:
+            self._open -= 1
+            return max(0, tracemalloc.get_traced_memory()[1] - base)
+
+
+TRACER = Tracer()
+
+
+def span(stage: str, name: str, bytes_in: int = 0):
+    """:meth:`Tracer.span` of :data:`TRACER`."""
+    return TRACER.span(stage, name, bytes_in)
+
+
+def worker_call(memory: bool, func, args):
+    """Run ``func(*args)`` traced in a worker process; return ``(result, spans)``."""
+    if not TRACER.enabled:
+        TRACER.start(memory)
+    result = func(*args)
+    return result, TRACER.drain()
+
+
+class _TimedReader:
+    def __init__(self, fp):
+        self.fp = fp
+        self.wall = self.cpu = 0.0
+        self.chars = 0
+
+    def read(self, size: int = -1) -> str:
+        start, cpu = time.perf_counter(), time.thread_time()
+        text = self.fp.read(size)
+        self.wall += time.perf_counter() - start
+        self.cpu += time.thread_time() - cpu
+        self.chars += len(text)
+        return text
+
+
+def stream(fp, parse, name: str):
+    """Yield from ``parse(reader)`` over text file ``fp``, recording interleaved decode and parse spans."""
+    if not TRACER.enabled:
+        yield from parse(fp)
+        return
+    reader = _TimedReader(fp)
+    rows = parse(reader)
+    wall = cpu = 0.0
+    first = None
+    try:
+        while True:
+            start, cpu_start = time.perf_counter(), time.thread_time()
+            if first is None:
+                first = start
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            finally:
+                wall += time.perf_counter() - start
+                cpu += time.thread_time() - cpu_start
+            yield row
+    finally:
+        if first is not None:
+            end = time.perf_counter()
+            pid, tid = os.getpid(), threading.get_native_id()
+            size = os.fstat(fp.fileno()).st_size
+            TRACER.add(Span('decode', name, first, end, reader.wall, reader.cpu, size, reader.chars, None,
+                            pid, tid, True))
+            TRACER.add(Span('parse', name, first, end, wall - reader.wall, cpu - reader.cpu, reader.chars, 0,
+                            None, pid, tid, True))
+
+
+def self_times(spans) -> dict:
+    """``{span: (self wall, self cpu)}``: each span less the spans nested directly in it on its thread."""
+    own = {s: [s.wall, s.cpu] for s in spans}
+    by_thread = collections.defaultdict(list)
+    for s in spans:
+        by_thread[s.pid, s.tid].append(s)
+    for group in by_thread.values():
+        group.sort(key=lambda s: (s.start, -s.end, s.interleaved))
+        stack = []
+        for s in group:
+            while stack and stack[-1].end <= s.start:
+                stack.pop()
+            if stack:
+                own[stack[-1]][0] -= s.wall
+                own[stack[-1]][1] -= s.cpu
+            # Interleaved spans are sums of slices, so nothing nests in them.
+            if not s.interleaved:
+                stack.append(s)
+    return {s: (max(0.0, wall), max(0.0, cpu)) for s, (wall, cpu) in own.items()}
+
+
+def chrome_trace(spans, origin: float = None) -> dict:
+    """Trace-event JSON with one complete (``"X"``) event per span, times in microseconds."""
+    spans = sorted(spans, key=lambda s: s.start)
+    if origin is None:
+        origin = spans[0].start if spans else 0.0
+    main = os.getpid()
+    events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+               'args': {'name': 'aronadict.build' if pid == main else f'worker {pid}'}}
+              for pid in dict.fromkeys(s.pid for s in spans)]
+    for s in spans:
+        args = {'cpu_ms': round(s.cpu * 1000, 3), 'bytes_in': s.bytes_in, 'bytes_out': s.bytes_out}
+        if s.peak is not None:
+            args['peak_bytes'] = s.peak
+        if s.interleaved:
+            # Drawn from the first read with the summed duration.
+            args['interleaved'] = True
+            args['until_us'] = round((s.end - origin) * 1e6)
+        events.append({'name': s.name, 'cat': s.stage, 'ph': 'X', 'pid': s.pid, 'tid': s.tid,
+                       'ts': round((s.start - origin) * 1e6, 1), 'dur': round(s.wall * 1e6, 1), 'args': args})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def write_chrome_trace(path: str, spans, origin: float = None) -> None:
+    write_if_changed(os.path.abspath(path), dump_compact(chrome_trace(spans, origin)))
+
+
+def _mib(n) -> str:
+    return f'{n / (1 << 20):9.2f}' if n is not None else f'{"-":>9}'
+
+
+def summary(spans, groups: dict = None) -> str:
+    """Per-stage totals, then one row of per-stage milliseconds per group.
+
+    ``groups`` maps a label (an extractor) to the span names that belong to
+    it; a document's fetch, decode and parse count in every group that reads
+    it, so group rows do not add up to the stage totals.
+    """
+    own = self_times(spans)
+    lines = [f'{"stage":10} {"spans":>6} {"wall ms":>10} {"cpu ms":>10} {"MiB in":>9} {"MiB out":>9} '
+             f'{"peak MiB":>9}']
+    for stage in STAGES:
+        chosen = [s for s in spans if s.stage == stage]
+        if not chosen:
+            continue
+        peaks = [s.peak for s in chosen if s.peak is not None]
+        lines.append(f'{stage:10} {len(chosen):6} {sum(own[s][0] for s in chosen) * 1000:10.1f} '
+                     f'{sum(own[s][1] for s in chosen) * 1000:10.1f} '
+                     f'{_mib(sum(s.bytes_in for s in chosen))} {_mib(sum(s.bytes_out for s in chosen))} '
+                     f'{_mib(max(peaks) if peaks else None)}')
+    if groups:
+        by_name = collections.defaultdict(list)
+        for s in spans:
+            by_name[s.name].append(s)
+        width = max(len(label) for label in groups)
+        lines.append('')
+        lines.append(f'{"":{width}} ' + ' '.join(f'{stage:>9}' for stage in STAGES) + f' {"peak MiB":>9}  (ms)')
+        for label, names in groups.items():
+            chosen = [s for name in dict.fromkeys(names) for s in by_name.get(name, ())]
+            totals = collections.Counter()
+            for s in chosen:
+                totals[s.stage] += own[s][0]
+            peaks = [s.peak for s in chosen if s.peak is not None]
+            lines.append(f'{label:{width}} ' + ' '.join(f'{totals[stage] * 1000:9.1f}' for stage in STAGES)
+                         + f' {_mib(max(peaks) if peaks else None)}')
+    return '\n'.join(lines)
@@ -0,0 +1,196 @@
+"""Version stamps and delta files for locale bundles.
+
+    python -m aronadict.versions apply LOCALE OLD_BUNDLE [--dist DIR] [--out FILE]
+
+Each time :func:`aronadict.bundle.build_bundle` writes a ``bundle.json``
+whose bytes differ from the previous one, :func:`stamp` bumps
+``dist/<locale>/version.json`` and writes the delta from the previous bundle::
+
+    version.json        {"format": 1, "version": 3, "hash": "<sha256 of bundle.json>",
+                         "deltas": [{"from": 1, "to": 2, "file": "deltas/1-2.json", "bytes": 412}, ...]}
+    deltas/2-3.json     {"format": 1, "from": {"version", "hash"}, "to": {"version", "hash"},
+                         "removed": [key, ...], "changed": {key: value},
+                         "added": [[position, key, value], ...]}
+
+A client holding version N applies every delta from N on (:func:`apply_delta`)
+instead of downloading the bundle again.  Key order is part of the bundle
+(``sortedEntries`` in content.js keeps it among keys of equal length), so a
+key that moved is removed and re-added at its new position; the result
+hashes to exactly the new bundle.
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+
+from .output import dump_compact, write_if_changed
+from .sources import DIST_DIR, LOCALES, dist_dir
+
+FORMAT = 1
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def stable_keys(old_order: list, new_order: list) -> set:
+    """Keys of both orders that keep their relative order (a longest increasing subsequence)."""
+    position = {key: i for i, key in enumerate(old_order)}
+    shared = [key for key in new_order if key in position]
+    tails, tail_keys, parent = [], [], {}
+    for key in shared:
+        i = bisect.bisect_left(tails, position[key])
+        parent[key] = tail_keys[i - 1] if i else None
+        if i == len(tails):
+            tails.append(position[key])
+            tail_keys.append(key)
+        else:
+            tails[i] = position[key]
+            tail_keys[i] = key
+    stable = set()
+    key = tail_keys[-1] if tail_keys else None
+    while key is not None:
+        stable.add(key)
+        key = parent[key]
+    return stable
+
+
+def make_delta(old: dict, new: dict) -> dict:
+    """``removed``, ``changed`` and ``added`` turning ``old`` into ``new``, order included."""
+    stable = stable_keys(list(old), list(new))
+    return {
+        'removed': [key for key in old if key not in stable],
+        'changed': {key: value for key, value in new.items() if key in stable and old[key] != value},
+        'added': [[i, key, value] for i, (key, value) in enumerate(new.items()) if key not in stable],
+    }
+
+
+def apply_delta(bundle: dict, delta: dict) -> dict:
+    """Return the bundle ``delta`` leads to from ``bundle``.
+
+    ``added`` positions are ascending indices into the new bundle, so the
+    kept entries and the added ones are interleaved in a single pass.
+    """
+    removed = set(delta['removed'])
+    changed = delta['changed']
+    added = iter(delta['added'])
+    pending = next(added, None)
+    result = {}
+    for key, value in bundle.items():
+        if key in removed:
+            continue
+        while pending is not None and pending[0] <= len(result):
+            result[pending[1]] = pending[2]
+            pending = next(added, None)
+        result[key] = changed.get(key, value)
+    while pending is not None:
+        result[pending[1]] = pending[2]
+        pending = next(added, None)
+    return result
+
+
+def load_version(folder: str) -> dict:
+    try:
+        with open(os.path.join(folder, 'version.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'format': FORMAT, 'version': 0, 'hash': None, 'deltas': []}
+
+
+def remove_unlisted(folder: str, version: dict) -> None:
+    """Delete the files in ``deltas/`` that ``version`` no longer lists."""
+    listed = {os.path.normpath(entry['file']) for entry in version['deltas']}
+    try:
+        names = os.listdir(os.path.join(folder, 'deltas'))
+    except FileNotFoundError:
+        return
+    for name in names:
+        if os.path.join('deltas', name) not in listed:
+            os.remove(os.path.join(folder, 'deltas', name))
+
+
+def stamp(folder: str, old_data, new_data: bytes) -> dict:
+    """Record ``new_data`` (the bundle.json that just replaced ``old_data``) in ``version.json``.
+
+    Call it after the bundle is written, so ``version.json`` never names a
+    bundle that is not there.  ``old_data`` is ``None`` when there was no
+    bundle.  Returns the version record.
+    """
+    version = load_version(folder)
+    digest = content_hash(new_data)
+    if digest == version['hash']:
+        return version
+    if old_data is not None and version['hash'] == content_hash(old_data):
+        old, new = json.loads(old_data), json.loads(new_data)
+        delta = make_delta(old, new)
+        if dump_compact(apply_delta(old, delta)) != new_data:
+            raise RuntimeError('delta does not reproduce the new bundle')
+        number = version['version']
+        name = f'deltas/{number}-{number + 1}.json'
+        data = dump_compact({'format': FORMAT,
+                             'from': {'version': number, 'hash': version['hash']},
+                             'to': {'version': number + 1, 'hash': digest}, **delta})
+        write_if_changed(os.path.join(folder, name), data)
+        version['deltas'].append({'from': number, 'to': number + 1, 'file': name, 'bytes': len(data)})
+    else:
+        # No trustworthy previous bundle: clients must download this one whole,
+        # and the old delta files go once version.json stops listing them.
+        version['deltas'] = []
+    version['version'] += 1
+    version['hash'] = digest
+    write_if_changed(os.path.join(folder, 'version.json'),
+                     json.dumps(version, ensure_ascii=False, indent=1).encode('utf-8'))
+    remove_unlisted(folder, version)
+    return version
+
+
+def update(folder: str, bundle: dict, version: int) -> dict:
+    """Apply the deltas in ``folder`` to ``bundle`` at ``version``; return the current bundle."""
+    for entry in load_version(folder)['deltas']:
+        if entry['from'] < version:
+            continue
+        with open(os.path.join(folder, entry['file']), encoding='utf-8') as f:
+            delta = json.load(f)
+        if delta['from']['hash'] != content_hash(dump_compact(bundle)):
+            raise ValueError(f"{entry['file']} does not apply to the bundle at version {version}")
+        bundle = apply_delta(bundle, delta)
+        version = entry['to']
+    return bundle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    apply = sub.add_parser('apply', help='bring an old bundle.json up to date with the deltas')
+    apply.add_argument('locale', choices=sorted(LOCALES))
+    apply.add_argument('bundle')
+    apply.add_argument('--dist', default=DIST_DIR)
+    apply.add_argument('--out', help='write the updated bundle here')
+    args = parser.parse_args(argv)
+
+    folder = dist_dir(args.locale, args.dist)
+    with open(args.bundle, 'rb') as f:
+        data = f.read()
+    current = load_version(folder)
+    digest = content_hash(data)
+    if digest == current['hash']:
+        print(f"already at version {current['version']}")
+        return
+    version = None
+    for entry in current['deltas']:
+        with open(os.path.join(folder, entry['file']), encoding='utf-8') as f:
+            if json.load(f)['from']['hash'] == digest:
+                version = entry['from']
+                break
+    if version is None:
+        raise SystemExit('no delta chain starts from this bundle; download bundle.json instead')
+    bundle = update(folder, json.loads(data), version)
+    size = sum(entry['bytes'] for entry in current['deltas'] if entry['from'] >= version)
+    print(f"version {version} -> {current['version']}: {current['version'] - version} delta(s), {size} bytes")
+    if args.out:
+        write_if_changed(os.path.abspath(args.out), dump_compact(bundle))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Throughput of skill-description cleaning, serial and over worker processes.
+
+    python benchmarks/clean_text.py [--locale jpn] [--replay NAME] [--scale 10] [--workers 1 2 4 8]
+
+Collects ``DescriptionKr`` and the locale's description of every
+LocalizeSkillExcelTable row (a snapshot with ``--replay``, otherwise the HTTP
+cache), repeated ``--scale`` times, and reports rows per second for the
+original four-substitution ``clean_text`` of locskillDescript.py, the fused
+:func:`aronadict.extractors.clean_text`, and the builder's
+``skill_Desc_mapping.json`` job from :func:`aronadict.extractors.jobs` with
+each worker count (``python -m aronadict.build --workers N``).  Every result
+must equal the original's.  Inputs below
+:data:`aronadict.extractors.PARALLEL_MIN` texts run serially whatever the
+worker count.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict import extractors
+from aronadict.build import Sources
+from aronadict.extractors import Rows
+from aronadict.snapshot import make_cache
+from aronadict.sources import LOCALES, skill_table_url
+
+
+def legacy_clean_text(text: str) -> str:
+    text = re.sub(r'\[.*?\]', '', text)
+    text = text.replace('\n', '')
+    text = re.sub(r'/([^ \s])', r'/ \1', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locale', choices=sorted(LOCALES), default='jpn')
+    parser.add_argument('--replay', metavar='NAME', help='read the table from snapshot NAME')
+    parser.add_argument('--scale', type=int, default=10, help='repeat the table this many times')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    sources = Sources(make_cache('replay', args.replay) if args.replay else None)
+    suffix = LOCALES[args.locale]['suffix']
+    fields = ('DescriptionKr', 'Description' + suffix)
+    table = [row for row in sources.resolve(Rows(skill_table_url(args.locale), fields))
+             if row.get(fields[0]) and row.get(fields[1])] * args.scale
+    texts = [row[field] for row in table for field in fields]
+    rows = len(table)
+    print(f'{len(texts)} texts ({rows} rows x 2 languages), {os.cpu_count()} CPUs')
+
+    elapsed, expected = timed(lambda: [legacy_clean_text(text) for text in texts])
+    print(f'{"original":14} {rows / elapsed:12.0f} rows/s')
+    base = elapsed
+    elapsed, fused = timed(extractors.clean_chunk, texts)
+    if fused != expected:
+        sys.exit('fused clean_text differs from the original')
+    print(f'{"fused":14} {rows / elapsed:12.0f} rows/s  ({base / elapsed:.1f}x)')
+    expected = dict(zip(expected[0::2], expected[1::2]))
+    for workers in args.workers:
+        _, func, _, kwargs = next(job for job in extractors.jobs(args.locale, workers)
+                                  if job[0] == 'skill_Desc_mapping.json')
+        elapsed, result = timed(lambda: func(table, **kwargs))
+        if result != expected:
+            sys.exit(f'skill_Desc_mapping.json with {workers} workers differs from the original')
+        serial = workers <= 1 or len(texts) < extractors.PARALLEL_MIN
+        label = f'{workers} worker' + ('s' if workers > 1 else '')
+        print(f'{label:14} {rows / elapsed:12.0f} rows/s  ({base / elapsed:.1f}x)'
+              + ('  serial' if serial and workers > 1 else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Load test of the fetch layer against the local stand-in server.
+
+    python benchmarks/fetch_standin.py SNAPSHOT [--latency 80] [--jitter 40] [--bandwidth 2048]
+                                               [--error-rate 0.1] [--per-host 4] [--seed 0]
+
+Serves SNAPSHOT with :mod:`aronadict.standin` under the given conditions and
+fetches every document it holds with :class:`aronadict.aiofetch.FetchEngine`
+into an empty cache (cold), then again with the cache warm (every response a
+304).  Reports wall time, retries and wire bytes for both passes and checks
+the fetched bodies against the snapshot's hashes.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict.aiofetch import PER_HOST, FetchEngine, make_session
+from aronadict.fetch import HttpCache
+from aronadict.snapshot import SNAPSHOT_DIR, Snapshot
+from aronadict.standin import Conditions, StandIn, url_path
+
+
+def fetch_pass(label: str, urls, root: str, per_host: int, expected: dict) -> None:
+    cache = HttpCache(root, session=make_session(per_host))
+    engine = FetchEngine(cache, per_host=per_host, backoff=0.05, max_backoff=0.5)
+    start = time.perf_counter()
+    stats = engine.run(urls)
+    elapsed = time.perf_counter() - start
+    for url in urls:
+        if cache.fetch(url)['sha256'] != expected[url]:
+            sys.exit(f'{url}: body does not match the snapshot')
+    statuses = sorted({s.status for s in stats})
+    retries = sum(s.attempts - 1 for s in stats)
+    wire = sum(s.wire_bytes for s in stats)
+    print(f'{label:5} {len(stats)} documents in {elapsed * 1000:8.0f} ms, status {statuses}, '
+          f'{retries} retries, {wire} wire bytes')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('snapshot')
+    parser.add_argument('--root', default=SNAPSHOT_DIR)
+    parser.add_argument('--latency', type=float, default=80.0, metavar='MS')
+    parser.add_argument('--jitter', type=float, default=40.0, metavar='MS')
+    parser.add_argument('--bandwidth', type=float, metavar='KBPS')
+    parser.add_argument('--error-rate', type=float, default=0.1)
+    parser.add_argument('--per-host', type=int, default=PER_HOST)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    conditions = Conditions(args.latency / 1000, args.jitter / 1000, args.bandwidth,
+                            args.error_rate, seed=args.seed)
+    server = StandIn(Snapshot(args.snapshot, args.root), conditions=conditions)
+    server.start()
+    try:
+        expected = {server.base + url_path(url): entry['sha256'] for url, entry in server.snapshot.entries.items()}
+        urls = list(expected)
+        with tempfile.TemporaryDirectory() as root:
+            fetch_pass('cold', urls, root, args.per_host, expected)
+            fetch_pass('warm', urls, root, args.per_host, expected)
+    finally:
+        server.shutdown()
+        server.server_close()
+    stats = server.stats
+    print(f"server: {stats['requests']} requests, {stats['injected']} injected failures, {stats['bytes']} bytes sent")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Size and decode time of every dictionary file in every encoding.
+
+    python benchmarks/formats.py [--root DIR] [--repeat 5] [--per-file]
+
+Reads each ``*.json`` in JPN-json/ and zh_TW-json/ under ``--root`` (the
+repository by default), encodes it in every encoding of
+:mod:`aronadict.formats` that can run here, checks that it decodes back to
+the same mapping, and reports bytes on disk and the best-of-``--repeat``
+Python decode time.  Encodings whose optional package is missing are listed
+as skipped.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict import formats
+from aronadict.fetch import REPO_ROOT
+from aronadict.sources import LOCALES
+
+
+def decode_time(decode, data: bytes, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def dictionary_files(root: str) -> list:
+    paths = []
+    for loc in LOCALES.values():
+        paths += sorted(glob.glob(os.path.join(root, loc['json_dir'], '*.json')))
+    return [path for path in paths if not path.endswith('.min.json')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--root', default=REPO_ROOT)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--per-file', action='store_true', help='print a row for every file')
+    args = parser.parse_args(argv)
+
+    names = [name for name in formats.names() if formats.available(name)]
+    skipped = [name for name in formats.names() if not formats.available(name)]
+    totals = {name: [0, 0.0] for name in names}
+    for path in dictionary_files(args.root):
+        with open(path, encoding='utf-8-sig') as f:
+            mapping = json.load(f)
+        row = []
+        for name in names:
+            _, encode, decode = formats.codec(name)
+            data = encode(mapping)
+            if decode(data) != mapping:
+                sys.exit(f'{path}: {name} does not round-trip')
+            seconds = decode_time(decode, data, args.repeat)
+            totals[name][0] += len(data)
+            totals[name][1] += seconds
+            row.append(f'{name} {len(data)}B {seconds * 1000:.2f}ms')
+        if args.per_file:
+            print(f'{os.path.relpath(path, args.root)}: ' + ', '.join(row))
+
+    base_size, base_time = totals['json']
+    print(f'{"encoding":14} {"bytes":>12} {"vs json":>8} {"decode ms":>10} {"vs json":>8}')
+    for name, (size, seconds) in totals.items():
+        print(f'{name:14} {size:12} {size / base_size:8.2f} {seconds * 1000:10.1f} {seconds / base_time:8.2f}')
+    for name in skipped:
+        print(f'{name:14} skipped (optional package missing)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark the fuzzy index against the exhaustive findFuzzy scan.
+
+    python benchmarks/fuzzy_index.py [--locale jpn] [--dist DIR] [--queries 40] [--threshold 0.95]
+
+Queries are bundle keys with 0-3 random character edits plus unrelated
+strings, like the spans content.js looks up.  For every query both
+:func:`aronadict.fuzzy.exhaustive_find` and :meth:`FuzzyIndex.find` run;
+the answers must agree, and the number of keys each one scores and the
+time it takes are reported.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict.automaton import js_sorted_entries, load_bundle
+from aronadict.fuzzy import THRESHOLD, FuzzyIndex, exhaustive_find
+from aronadict.sources import DIST_DIR, LOCALES, dist_dir
+
+
+def mutate(rng: random.Random, text: str, edits: int, alphabet: str) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        op = rng.choice('sid') if chars else 'i'
+        pos = rng.randrange(len(chars) + (op == 'i'))
+        if op == 's':
+            chars[pos] = rng.choice(alphabet)
+        elif op == 'i':
+            chars.insert(pos, rng.choice(alphabet))
+        else:
+            del chars[pos]
+    return ''.join(chars)
+
+
+def make_queries(keys: list, count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    alphabet = ''.join(sorted(set(''.join(rng.sample(keys, min(len(keys), 200))))))
+    queries = []
+    for i in range(count):
+        if i % 4 == 3:
+            queries.append(''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 40))))
+        else:
+            queries.append(mutate(rng, rng.choice(keys), rng.randint(0, 3), alphabet))
+    return queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locale', choices=sorted(LOCALES), default='jpn')
+    parser.add_argument('--dist', default=DIST_DIR)
+    parser.add_argument('--queries', type=int, default=40)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    bundle = load_bundle(args.locale, args.dist)
+    entries = js_sorted_entries(bundle)
+    path = os.path.join(dist_dir(args.locale, args.dist), 'fuzzy.json')
+    index = FuzzyIndex.load(path) if os.path.exists(path) else FuzzyIndex.from_mapping(bundle)
+    queries = make_queries(list(bundle), args.queries)
+
+    scan_times, index_times, scan_scored, index_scored, found = [], [], [], [], 0
+    for text in queries:
+        start = time.perf_counter()
+        expected, scored = exhaustive_find(entries, text, args.threshold)
+        scan_times.append(time.perf_counter() - start)
+        scan_scored.append(scored)
+
+        start = time.perf_counter()
+        actual, scored = index.find(text, args.threshold)
+        index_times.append(time.perf_counter() - start)
+        index_scored.append(scored)
+
+        if actual != expected:
+            sys.exit(f'mismatch for {text!r}: scan {expected!r}, index {actual!r}')
+        found += expected is not None
+
+    print(f'{len(queries)} queries over {len(entries)} keys, {found} matched, answers identical')
+    for name, times, scored in (('exhaustive', scan_times, scan_scored), ('index', index_times, index_scored)):
+        print(f'{name:10}  keys scored: mean {statistics.mean(scored):8.1f}  max {max(scored):6}   '
+              f'latency: median {statistics.median(times) * 1000:8.2f} ms  max {max(times) * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
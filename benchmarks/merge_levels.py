@@ -0,0 +1,174 @@
+"""Benchmark the level-merging pass of skill_Desc_one_row.json.
+
+    python benchmarks/merge_levels.py [--locale jpn] [--replay NAME] [--repeat 5]
+
+Builds the one-row input mapping from the recorded LocalizeSkillExcelTable
+(a snapshot with ``--replay``, otherwise the HTTP cache), then times the
+original adjacency loop from loc_skill_Desc_one_row.py against a one-pass
+rewrite of it (:func:`merge_levels`) and checks that both produce the same
+bytes.  :func:`aronadict.extractors.group_levels`, which the build now
+uses, is timed alongside.
+"""
+import argparse
+import collections
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict import extractors
+from aronadict.build import Sources
+from aronadict.extractors import Rows, extract_numbers_and_mask, merge_number_sequences, replace_placeholders
+from aronadict.output import dump_mapping
+from aronadict.snapshot import make_cache
+from aronadict.sources import LOCALES, schaledb_url, skill_table_url
+
+
+def legacy_extract_numbers_and_mask(text):
+    numbers = re.findall(r'(\d+(?:\.\d+)?%?)', text)
+    masked_text = re.sub(r'(\d+(?:\.\d+)?%?)', '{num}', text)
+    return masked_text, numbers
+
+
+def legacy_merge_number_sequences(sequences):
+    if not sequences:
+        return []
+    merged_numbers = []
+    for i in range(len(sequences[0])):
+        nums_at_pos = [seq[i] for seq in sequences]
+        if len(set(nums_at_pos)) == 1:
+            merged_numbers.append(nums_at_pos[0])
+        else:
+            merged_numbers.append('/'.join(nums_at_pos))
+    return merged_numbers
+
+
+def legacy_replace_placeholders(masked_text, numbers):
+    parts = masked_text.split('{num}')
+    result = ""
+    for i, part in enumerate(parts):
+        result += part
+        if i < len(numbers):
+            result += numbers[i]
+    return result
+
+
+def legacy_merge_levels(mapping):
+    """The loop loc_skill_Desc_one_row.py used to run, unchanged."""
+    processed_mapping = collections.OrderedDict()
+    items = list(mapping.items())
+    i = 0
+    while i < len(items):
+        current_key, current_value = items[i]
+        current_masked_key, current_key_nums = legacy_extract_numbers_and_mask(current_key)
+        current_masked_value, current_value_nums = legacy_extract_numbers_and_mask(current_value)
+        current_group = [(current_key, current_value, current_key_nums, current_value_nums)]
+        j = i + 1
+        while j < len(items):
+            next_key, next_value = items[j]
+            next_masked_key, next_key_nums = legacy_extract_numbers_and_mask(next_key)
+            next_masked_value, next_value_nums = legacy_extract_numbers_and_mask(next_value)
+            if (current_masked_key == next_masked_key and
+                    current_masked_value == next_masked_value and
+                    len(current_key_nums) == len(next_key_nums) and
+                    len(current_value_nums) == len(next_value_nums)):
+                current_group.append((next_key, next_value, next_key_nums, next_value_nums))
+                j += 1
+            else:
+                break
+        if len(current_group) > 1:
+            merged_key_nums = legacy_merge_number_sequences([item[2] for item in current_group])
+            merged_value_nums = legacy_merge_number_sequences([item[3] for item in current_group])
+            base_masked_key, _ = legacy_extract_numbers_and_mask(current_group[0][0])
+            base_masked_value, _ = legacy_extract_numbers_and_mask(current_group[0][1])
+            merged_key = legacy_replace_placeholders(base_masked_key, merged_key_nums)
+            merged_value = legacy_replace_placeholders(base_masked_value, merged_value_nums)
+            processed_mapping[merged_key] = merged_value
+            i = j
+        else:
+            processed_mapping[current_key] = current_value
+            i += 1
+    return processed_mapping
+
+
+def merge_levels(mapping: dict) -> dict:
+    """The adjacency loop in one pass, on the shared helpers.
+
+    One pass over ``mapping``: every key and value is masked once (values
+    repeat, so their masks are cached) and a run is emitted as soon as the
+    next entry's masked shape differs from it.
+    """
+    processed_mapping = collections.OrderedDict()
+    masks = {}
+    run = []
+    run_shape = None
+
+    def flush():
+        if len(run) > 1:
+            merged_key = replace_placeholders(run_shape[0], merge_number_sequences([item[2] for item in run]))
+            merged_value = replace_placeholders(run_shape[1], merge_number_sequences([item[3] for item in run]))
+            processed_mapping[merged_key] = merged_value
+        elif run:
+            processed_mapping[run[0][0]] = run[0][1]
+
+    for key, value in mapping.items():
+        masked_key, key_nums = extract_numbers_and_mask(key)
+        if value not in masks:
+            masks[value] = extract_numbers_and_mask(value)
+        masked_value, value_nums = masks[value]
+        shape = (masked_key, masked_value, len(key_nums), len(value_nums))
+        if shape != run_shape:
+            flush()
+            run = []
+            run_shape = shape
+        run.append((key, value, key_nums, value_nums))
+    flush()
+    return processed_mapping
+
+
+def one_row_input(sources: Sources, locale: str) -> list:
+    """The ``(skill, kr, target)`` rows skill_Desc_one_row.json is built from."""
+    loc = LOCALES[locale]
+    suffix = loc['suffix']
+    students = sources.get(schaledb_url(loc['lang'], 'students'))
+    rows = sources.resolve(Rows(skill_table_url(locale),
+                                ('NameKr', 'DescriptionKr', 'Description' + suffix, 'Name' + suffix)))
+    ex_names = extractors.ex_skill_names(students)
+    return list(extractors.skill_levels(rows, ex_names, suffix))
+
+
+def best_of(func, arg, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locale', choices=sorted(LOCALES), default='jpn')
+    parser.add_argument('--replay', metavar='NAME', help='read the table from snapshot NAME')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sources = Sources(make_cache('replay', args.replay) if args.replay else None)
+    entries = one_row_input(sources, args.locale)
+    mapping = {kr: tgt for _, kr, tgt in entries}
+
+    legacy_time, legacy = best_of(legacy_merge_levels, mapping, args.repeat)
+    new_time, new = best_of(merge_levels, mapping, args.repeat)
+    if dump_mapping(legacy) != dump_mapping(new):
+        sys.exit('merge_levels output differs from the legacy loop')
+    group_time, grouped = best_of(extractors.group_levels, entries, args.repeat)
+    print(f'{len(mapping)} entries')
+    print(f'legacy       {legacy_time * 1000:8.2f} ms  {len(legacy)} merged')
+    print(f'merge_levels {new_time * 1000:8.2f} ms  {len(new)} merged ({legacy_time / new_time:.1f}x)')
+    print(f'group_levels {group_time * 1000:8.2f} ms  {len(grouped)} merged by skill')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Microbenchmark of the similarity kernels.
+
+    python benchmarks/similarity_kernel.py [--locale jpn] [--dist DIR] [--candidates 400] [--threshold 0.95]
+
+For short names (2-12 characters) and skill descriptions (180-220
+characters) taken from the bundle, one edited key is scored against a batch of
+keys of the same kind with:
+
+* ``dp``: the row-by-row Levenshtein of content.js (:func:`aronadict.fuzzy.similarity`);
+* ``myers``: :func:`aronadict.myers.score_batch` without a threshold;
+* ``myers@T``: the same with the threshold, aborting hopeless candidates.
+
+Scores must equal the dynamic programme's (``None`` exactly where it is below
+the threshold).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict import fuzzy, myers
+from aronadict.automaton import load_bundle
+from aronadict.sources import DIST_DIR, LOCALES
+from benchmarks.fuzzy_index import mutate
+
+GROUPS = [('short names', 2, 12), ('skill descriptions', 180, 220)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locale', choices=sorted(LOCALES), default='jpn')
+    parser.add_argument('--dist', default=DIST_DIR)
+    parser.add_argument('--candidates', type=int, default=400)
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=fuzzy.THRESHOLD)
+    args = parser.parse_args(argv)
+
+    keys = list(load_bundle(args.locale, args.dist))
+    rng = random.Random(0)
+    alphabet = ''.join(sorted(set(''.join(keys[:500]))))
+    for name, low, high in GROUPS:
+        group = [key for key in keys if low <= len(key) <= high]
+        if not group:
+            continue
+        batch = rng.sample(group, min(args.candidates, len(group)))
+        totals = {'dp': 0.0, 'myers': 0.0, f'myers@{args.threshold}': 0.0}
+        for _ in range(args.queries):
+            query = mutate(rng, rng.choice(batch), rng.randint(0, 3), alphabet)
+            elapsed, expected = timed(lambda: [fuzzy.similarity(query, key) for key in batch])
+            totals['dp'] += elapsed
+            elapsed, plain = timed(lambda: myers.score_batch(query, batch))
+            totals['myers'] += elapsed
+            elapsed, bounded = timed(lambda: myers.score_batch(query, batch, args.threshold))
+            totals[f'myers@{args.threshold}'] += elapsed
+            if plain != expected or bounded != [s if s >= args.threshold else None for s in expected]:
+                sys.exit(f'score mismatch for {query!r}')
+        pairs = len(batch) * args.queries
+        print(f'{name}: {pairs} pairs, scores identical')
+        for kernel, total in totals.items():
+            print(f'  {kernel:12} {total / pairs * 1e6:10.1f} us/pair  ({totals["dp"] / total:6.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
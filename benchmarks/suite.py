@@ -0,0 +1,232 @@
+"""Benchmark every extractor and dictionary artifact on a recorded snapshot.
+
+    python benchmarks/suite.py SNAPSHOT [--locale jpn zh_tw] [--repeat 3] [--only PATTERN]
+                                        [--history FILE] [--check] [--no-record]
+                                        [--time-tolerance 0.25] [--memory-tolerance 0.10]
+                                        [--size-tolerance 0.01] [--time-floor 0.005]
+
+The upstream documents come from snapshot SNAPSHOT (see
+:mod:`aronadict.snapshot`; record one with ``python -m aronadict.build
+--record NAME``), so every run sees the same inputs.  For each JPN and zh_TW
+extractor the suite measures, from parsed-nothing to serialised JSON:
+
+``wall_s``      best wall time of ``--repeat`` runs
+``peak_bytes``  tracemalloc peak of one more run
+``entries``     entries in the output
+``bytes``       size of the output as written (``json.dump(..., indent=4)``)
+
+then builds the ``dist/`` artifacts (bundle, automaton, fuzzy index, interned
+table, shards) from those outputs in a temporary folder and measures them the
+same way.
+
+Every run is appended as one JSON line to ``--history`` (default
+``.build/benchmarks/history.jsonl``).  With ``--check`` the run is compared
+to the latest earlier run of the same snapshot on the same machine, and the
+script exits with status 1 if a metric got worse by more than its tolerance:
+time or memory up, bytes up, or entries down.  Timings below
+``--time-floor`` seconds are too noisy to judge and are not checked.
+"""
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict.automaton import write_automaton
+from aronadict.build import Sources, output_dir, plan, table_langs
+from aronadict.bundle import build_bundle
+from aronadict.fetch import BUILD_DIR, REPO_ROOT
+from aronadict.fuzzy import write_index
+from aronadict.interned import write_interned
+from aronadict.output import dump_mapping, write_if_changed
+from aronadict.shards import build_shards
+from aronadict.snapshot import make_cache
+from aronadict.sources import LOCALES, dist_dir
+
+HISTORY = os.path.join(BUILD_DIR, 'benchmarks', 'history.jsonl')
+FORMAT = 1
+
+
+def measure(run, repeat: int) -> tuple:
+    """Return ``(result, best wall seconds, tracemalloc peak)`` of ``run()``."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def folder_bytes(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(folder, name))
+               for folder, _, names in os.walk(path) for name in names)
+
+
+def extractor_runner(step, cache):
+    _, _, func, job_sources, kwargs = step
+    langs = table_langs([step])
+
+    def run():
+        sources = Sources(cache, langs)
+        mapping = func(*[sources.resolve(src) for src in job_sources], **kwargs)
+        return mapping, dump_mapping(mapping)
+    return run
+
+
+def artifact_runners(locale: str, root: str, cache, langs) -> list:
+    """``(name, run, path)`` for each dist artifact of ``locale`` built under ``root``."""
+    dist = os.path.join(root, 'dist')
+    out = dist_dir(locale, dist)
+    return [
+        ('bundle.json', lambda: build_bundle(locale, root, dist), os.path.join(out, 'bundle.json')),
+        ('automaton.json', lambda: write_automaton(locale, dist), os.path.join(out, 'automaton.json')),
+        ('fuzzy.json', lambda: write_index(locale, dist), os.path.join(out, 'fuzzy.json')),
+        ('interned.json', lambda: write_interned(locale, root, dist), os.path.join(out, 'interned.json')),
+        ('shards/', lambda: build_shards(locale, Sources(cache, langs), dist), os.path.join(out, 'shards')),
+    ]
+
+
+def run_suite(snapshot: str, locales, repeat: int, only: str = None) -> dict:
+    cache = make_cache('replay', snapshot)
+    steps = plan(locales)
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        for step in steps:
+            locale, output = step[:2]
+            name = f'{locale}/{output}'
+            run = extractor_runner(step, cache)
+            if only and not fnmatch.fnmatch(name, only):
+                # Artifacts still need the file.
+                mapping, data = run()
+            else:
+                (mapping, data), wall, peak = measure(run, repeat)
+                results[name] = {'wall_s': wall, 'peak_bytes': peak, 'entries': len(mapping), 'bytes': len(data)}
+            write_if_changed(os.path.join(output_dir(locale, output, root), output), data)
+        langs = table_langs(steps)
+        for locale in locales:
+            for artifact, run, path in artifact_runners(locale, root, cache, langs):
+                name = f'{locale}/dist/{artifact}'
+                if only and not fnmatch.fnmatch(name, only):
+                    run()
+                    continue
+                _, wall, peak = measure(run, repeat)
+                results[name] = {'wall_s': wall, 'peak_bytes': peak, 'bytes': folder_bytes(path)}
+    return results
+
+
+def machine() -> dict:
+    return {'host': platform.node(), 'python': platform.python_version(), 'cpus': os.cpu_count()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> list:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def regressions(baseline: dict, current: dict, tolerances: dict, time_floor: float) -> list:
+    """``(name, metric, before, after)`` for every metric that worsened beyond its tolerance."""
+    found = []
+    for name, metrics in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for metric, after in metrics.items():
+            if metric not in before:
+                continue
+            old = before[metric]
+            if metric == 'entries':
+                worse = after < old
+            elif metric == 'wall_s' and max(old, after) < time_floor:
+                worse = False
+            else:
+                worse = after > old * (1 + tolerances[metric])
+            if worse:
+                found.append((name, metric, old, after))
+    return found
+
+
+def format_value(metric: str, value) -> str:
+    if metric == 'wall_s':
+        return f'{value * 1000:.1f} ms'
+    if metric in ('peak_bytes', 'bytes'):
+        return f'{value / 1024:.1f} KiB'
+    return str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('snapshot')
+    parser.add_argument('--locale', nargs='+', choices=sorted(LOCALES), default=list(LOCALES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', metavar='PATTERN', help='only measure names matching, e.g. "*/skill_*"')
+    parser.add_argument('--history', default=HISTORY)
+    parser.add_argument('--check', action='store_true', help='fail if a metric regressed against the last run')
+    parser.add_argument('--no-record', action='store_true', help='do not append this run to the history')
+    parser.add_argument('--time-tolerance', type=float, default=0.25)
+    parser.add_argument('--memory-tolerance', type=float, default=0.10)
+    parser.add_argument('--size-tolerance', type=float, default=0.01)
+    parser.add_argument('--time-floor', type=float, default=0.005, metavar='SECONDS')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.snapshot, args.locale, args.repeat, args.only)
+    print(f'{"":44} {"wall ms":>9} {"peak KiB":>10} {"entries":>8} {"KiB":>10}')
+    for name, m in results.items():
+        entries = m.get('entries', '')
+        print(f'{name:44} {m["wall_s"] * 1000:9.1f} {m["peak_bytes"] / 1024:10.1f} {entries:>8} '
+              f'{m["bytes"] / 1024:10.1f}')
+
+    record = {'format': FORMAT, 'time': time.time(), 'commit': git_commit(), 'snapshot': args.snapshot,
+              'machine': machine(), 'results': results}
+    history = load_history(args.history)
+    failed = []
+    if args.check:
+        earlier = [r for r in history if r['snapshot'] == args.snapshot and r['machine'] == record['machine']]
+        if not earlier:
+            print('no earlier run of this snapshot on this machine to compare with')
+        else:
+            baseline = earlier[-1]
+            tolerances = {'wall_s': args.time_tolerance, 'peak_bytes': args.memory_tolerance,
+                          'bytes': args.size_tolerance}
+            failed = regressions(baseline['results'], results, tolerances, args.time_floor)
+            print(f"compared with {baseline.get('commit') or 'an earlier run'} "
+                  f"({time.strftime('%Y-%m-%d %H:%M', time.localtime(baseline['time']))}): "
+                  f'{len(failed)} regression(s)')
+            for name, metric, old, new in failed:
+                print(f'  {name}: {metric} {format_value(metric, old)} -> {format_value(metric, new)}')
+    if not args.no_record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,51 +1,8 @@
-import json
-import requests
+import os
+import sys
 
-# 请求数据
-tw_url = 'https://schaledb.com/data/tw/students.json'
-kr_url = 'https://schaledb.com/data/kr/students.json'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict.cli import run_extractor
 
-tw_response = requests.get(tw_url)
-kr_response = requests.get(kr_url)
-
-# 确保请求成功
-kr_response.raise_for_status()
-tw_response.raise_for_status()
-
-# 加载 JSON 数据
-kr_data = kr_response.json()
-tw_data = tw_response.json()
-
-# 创建一个字典来存储技能名称映射
-skill_name_mapping = {}
-
-# 遍历两份数据以映射技能名称
-for student_id in kr_data:
-    kr_student = kr_data.get(student_id)
-    tw_student = tw_data.get(student_id)
-
-    # 确保两边都有学生数据
-    if not kr_student or not tw_student:
-        continue
-
-    # 获取技能信息
-    kr_skills = kr_student.get('Skills', {})
-    tw_skills = tw_student.get('Skills', {})
-
-    # 遍历技能信息
-    for skill_type in kr_skills:
-        kr_skill = kr_skills.get(skill_type, {})
-        tw_skill = tw_skills.get(skill_type, {})
-
-        kr_skill_name = kr_skill.get('Name')
-        tw_skill_name = tw_skill.get('Name')
-
-        # 确保技能名称存在
-        if kr_skill_name and tw_skill_name:
-            skill_name_mapping[kr_skill_name] = tw_skill_name
-
-# 将结果保存到 JSON 文件
-with open('skill_name_mapping.json', 'w', encoding='utf-8') as outfile:
-    json.dump(skill_name_mapping, outfile, ensure_ascii=False, indent=4)
-
-print("Skill name mappings saved to skill_name_mapping.json")
+if __name__ == '__main__':
+    run_extractor('zh_tw', 'skill_name_mapping.json')
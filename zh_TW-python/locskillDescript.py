@@ -1,38 +1,8 @@
-import requests
-import json
-import re
+import os
+import sys
 
-url = "https://raw.githubusercontent.com/electricgoat/ba-data/refs/heads/global/DB/LocalizeSkillExcelTable.json"
-response = requests.get(url)
-data = response.json()
-
-def clean_text(text: str) -> str:
-    # 移除所有 [xxx] 標籤
-    text = re.sub(r'\[.*?\]', '', text)
-    # 去除換行
-    text = text.replace('\n', '')
-    # 如果 / 後面緊接文字，就插入空白
-    text = re.sub(r'/([^ \s])', r'/ \1', text)
-    # 收斂多重空格並去除首尾空白
-    return re.sub(r'\s+', ' ', text).strip()
-
-def build_mapping(data: dict) -> dict:
-    mapping = {}
-    for item in data.get("DataList", []):
-        kr = item.get("DescriptionKr", "")
-        tw = item.get("DescriptionTw", "")
-        if kr and tw:
-            kr_clean = clean_text(kr)
-            tw_clean = clean_text(tw)
-            mapping[kr_clean] = tw_clean
-    return mapping
-
-output_file = "skill_Desc_mapping.json"
-with open(output_file, 'w', encoding='utf-8') as outfile:
-    json.dump(build_mapping(data), outfile, ensure_ascii=False, indent=4)
-
-if __name__ == "__main__":
-    mapping = build_mapping(data)
-    print(f"Mapping saved to {output_file}")
-    
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aronadict.cli import run_extractor
 
+if __name__ == '__main__':
+    run_extractor('zh_tw', 'skill_Desc_mapping.json')